@@ -1,28 +1,49 @@
 import click
-import pkg_resources
-from nexora.app import App
-from nexora.logger import logger
+from nexora.profiler import ImportProfiler
 import os
 
+def get_version():
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        import pkg_resources
+
+        try:
+            return pkg_resources.get_distribution("nexora").version
+        except pkg_resources.DistributionNotFound:
+            return "unknown"
+
+    try:
+        return version("nexora")
+    except PackageNotFoundError:
+        return "unknown"
+
 @click.command()
 @click.option('--permissive', '-p', is_flag=True, default=False, help='Automatically grant permission for all safe operations.')
 @click.option('--model', '-m', help='Model provider and name in format provider/model_name')
 @click.option('--api-key', '-k', help='API key for model provider')
 @click.option('--verbose', '-v', is_flag=True, default=False, help='Spit out more information when making requests')
+@click.option('--startup-profile', is_flag=True, default=False, help='Print a per-module import time breakdown once the model is loaded')
 @click.argument('directory', required=False, type=click.Path(exists=True, file_okay=False))
-def main(permissive, model, api_key, verbose, directory):
-    try:
-        __version__ = pkg_resources.get_distribution("nexora").version
-    except pkg_resources.DistributionNotFound:
-        __version__ = "unknown"
-    
+def main(permissive, model, api_key, verbose, startup_profile, directory):
+    profiler = None
+
+    if startup_profile:
+        profiler = ImportProfiler()
+        profiler.start()
+
+    from nexora.app import App
+    from nexora.logger import logger
+
+    __version__ = get_version()
+
     logger.info(f"Nexora version: {__version__}")
 
     provider, model_name = model.split("/", 1) if model else (None, None)
-    
+
     app = App()
 
-    app.start(permissive=permissive, directory=directory if directory else '.', model_name=model_name, provider=provider, verbose=verbose, api_key=api_key)
+    app.start(permissive=permissive, directory=directory if directory else '.', model_name=model_name, provider=provider, verbose=verbose, api_key=api_key, profiler=profiler)
 
 if __name__ == "__main__":
     main()
@@ -19,7 +19,33 @@ class App:
             
             sys.exit(0)
 
-    def start(self, permissive: bool, directory: Optional[str], model_name: Optional[str] = None, provider: Optional[str] = None, verbose: Optional[bool] = None, api_key: Optional[str] = None, preload_prompt: Optional[str] = None) -> None:
+    def create_model(self, provider: str, model_name: str):
+        """Instantiates a model with its provider's and its own settings from the config."""
+        model_class = self.config.get_model_class(provider, model_name)
+
+        # Fetch and merge settings
+        provider_settings = self.config.settings.get('providers', {}).get(provider, {})
+        model_settings = provider_settings.get('models', {}).get(model_name, {})
+        effective_settings = {**provider_settings, **model_settings}
+
+        # Instantiate model and dynamically set attributes
+        model_instance = model_class()
+        for attr, value in effective_settings.items():
+            if hasattr(model_instance, attr):
+                setattr(model_instance, attr, value)
+
+        if model_name:
+            # Only set it if model is None
+            if not model_instance.model:
+                model_instance.model = model_name
+
+        # A router is made of other configured models
+        if hasattr(model_instance, "build_routes"):
+            model_instance.build_routes(self.create_model)
+
+        return model_instance
+
+    def start(self, permissive: bool, directory: Optional[str], model_name: Optional[str] = None, provider: Optional[str] = None, verbose: Optional[bool] = None, api_key: Optional[str] = None, preload_prompt: Optional[str] = None, profiler=None) -> None:
         level = logging.DEBUG if verbose else logging.INFO
         console.setLevel(level)
         logger.setLevel(level)
@@ -48,34 +74,22 @@ class App:
             sys.exit(1)
 
         try:
-            model_class = self.config.get_model_class(provider, model_name)
+            model_instance = self.create_model(provider, model_name)
         except ModelNotFoundException as e:
             logger.error(f"Error getting model class: {e}")
             sys.exit(1)
 
-        # Fetch and merge settings
-        provider_settings = self.config.settings.get('providers', {}).get(provider, {})
-        model_settings = provider_settings.get('models', {}).get(model_name, {})
-        effective_settings = {**provider_settings, **model_settings}
-
-        # Instantiate model and dynamically set attributes
-        model_instance = model_class()
-        for attr, value in effective_settings.items():
-            if hasattr(model_instance, attr):
-                setattr(model_instance, attr, value)
-
-        # Set model & API key if passed as an argument
+        # Set API key if passed as an argument
         if api_key:
             model_instance.api_key = api_key
 
-        if model_name:
-            # Only set it if model is None
-            if not model_instance.model:
-                model_instance.model = model_name
-
         # Logic handles processes including model
         self.logic = Logic(self, model=model_instance)
 
+        if profiler:
+            profiler.stop()
+            profiler.report()
+
         # Start handling inputs with optional preload prompt
         input_handler = Input(permissive=permissive, directory=directory, logic=self.logic)
         input_handler.start(preload_prompt=preload_prompt)
@@ -1,6 +1,8 @@
 import os
 import importlib
 
+from nexora.logger import logger
+
 class Commands:
     def __init__(self, input, logic):
         self.input = input
@@ -15,7 +17,13 @@ class Commands:
                 module_name = filename[:-3]
                 module = importlib.import_module(f"nexora.commands.{module_name}")
                 command_class = getattr(module, module_name.capitalize())
-                self.commands[module_name] = command_class()
+                command = command_class()
+
+                # Give commands access to the session they run in
+                command.input = self.input
+                command.logic = self.logic
+
+                self.commands[module_name] = command
 
     def execute(self, user_input):
         parts = user_input[1:].split()
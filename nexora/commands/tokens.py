@@ -0,0 +1,28 @@
+from nexora import tokens
+
+class Tokens:
+    def run(self, *args):
+        """Show the estimated token count of the next request, by part."""
+        model = self.logic.model
+        breakdown = tokens.request_breakdown(model, compact=False)
+        total = breakdown["system"] + breakdown["tools"] + breakdown["messages"]
+
+        lines = [
+            f"System prompt: {breakdown['system']}",
+            f"Tool schemas: {breakdown['tools']}",
+            f"Messages ({breakdown['message_count']}): {breakdown['messages']}",
+            f"Total: ~{total} tokens" + (f" of {model.max_input_tokens} allowed" if model.max_input_tokens else ""),
+        ]
+
+        usage = getattr(model, "usage", None)
+
+        if usage:
+            lines.append("Session usage: " + ", ".join(f"{key}={value}" for key, value in usage.items()))
+
+        metrics = model.scheduler.metrics
+        lines.append(
+            f"Requests: {metrics['requests']}, retries: {metrics['retries']}, "
+            f"throttled: {metrics['throttled_seconds']:.1f}s, backing off: {metrics['backoff_seconds']:.1f}s"
+        )
+
+        return "\n".join(lines)
@@ -1,14 +1,32 @@
 import os
 import yaml
-
-from nexora.models.openai.gpt35 import GPT35  
-from nexora.models.anthropic import BaseAnthropic
-from nexora.models.openai.gpt4 import GPT4
-from nexora.models.openai.gpt4o import GPT4o
-from nexora.models.ollama import Ollama
+import importlib
 
 from nexora.exceptions import ModelNotFoundException
 
+# Providers are referenced by dotted path and only imported once selected,
+# so starting a session doesn't pull in every provider's SDK.
+MODEL_MAP = {
+    'openai': {
+        'gpt-3.5': 'nexora.models.openai.gpt35:GPT35',
+        'gpt-4': 'nexora.models.openai.gpt4:GPT4',
+        'gpt-4o': 'nexora.models.openai.gpt4o:GPT4o',
+    },
+    'anthropic': {
+        'default': 'nexora.models.anthropic:BaseAnthropic',  # Assuming a single class for any Anthropics' model
+    },
+    "ollama": {
+        "default": "nexora.models.ollama:Ollama"
+    },
+    "router": {
+        "default": "nexora.models.router:Router"
+    }
+}
+
+# Third-party packages can register providers under this entry point group,
+# named either `provider` or `provider/model_name`
+ENTRY_POINT_GROUP = 'nexora.models'
+
 class Config:
     defaults = {
         'defaults': {
@@ -16,6 +34,32 @@ class Config:
             'provider': "openai",
             # Additional default configuration options can be added here
         },
+        'context': {
+            # Maximum number of directory entries listed in the system prompt
+            'listing_limit': 200,
+        },
+        'compaction': {
+            'enabled': True,
+            # Estimated history size at which old turns are summarized
+            'max_tokens': 100000,
+            # Number of most recent messages that are never shortened
+            'keep_recent': 6,
+            # Older tool results above this size are cut down to their head and tail
+            'max_tool_return_tokens': 2000,
+            'summarize': True,
+        },
+        'http': {
+            # Seconds to wait for a connection, and between bytes of a response
+            'connect_timeout': 10,
+            'read_timeout': 60,
+            # Response bodies returned to the model are cut off after this many bytes
+            'max_response_bytes': 200000,
+            # Connections kept alive per host
+            'pool_size': 10,
+            # GET responses are cached under ~/.config/nexora/cache, up to this many bytes
+            'cache': True,
+            'cache_max_bytes': 50 * 1024 * 1024,
+        },
         "providers": {
             "openai": {
                 "api_key": None,
@@ -46,7 +90,40 @@ class Config:
 #       gpt-4:
 #         temperature: 0.75
 #   anthropic:
-#     api_key: 'sk-thisisalsoasecretkeylol'"""
+#     api_key: 'sk-thisisalsoasecretkeylol'
+#     # Requests are held back to stay within these limits, and retried with
+#     # backoff up to max_retries times on rate limit and server errors
+#     rate_limits:
+#       requests_per_minute: 50
+#       tokens_per_minute: 40000
+#     max_retries: 5
+#   # Use with `provider: router` to spread requests over several models
+#   router:
+#     # "fallback" tries the routes in order when one fails or times out,
+#     # "race" sends every request to all of them and takes the first answer
+#     policy: fallback
+#     timeout: 60
+#     routes:
+#       - provider: anthropic
+#         model: claude-3-5-sonnet-20240620
+#       - provider: openai
+#         model: gpt-4o
+#     # Compaction summaries go here first; add tool_return to also send the turns
+#     # answering tool results, which then may come from a less capable model
+#     cheap_route:
+#       provider: ollama
+#       model: llama3.1
+#     cheap_turns: [summary]
+
+# Maximum number of directory entries shown to the model in the system prompt
+# context:
+#   listing_limit: 200
+
+# Timeouts (in seconds) and the response size limit of the http tool
+# http:
+#   connect_timeout: 10
+#   read_timeout: 60
+#   max_response_bytes: 200000"""
     
     def __init__(self):
         self.config_path = os.path.expanduser('~/.config/nexora/config.yaml')
@@ -87,9 +164,9 @@ class Config:
             if key_list:
                 key = key_list.pop(0)
                 if key in settings:
-                    return get_recursive(key_list, settings[key], default.get(key, None))
+                    return get_recursive(key_list, settings[key], (default or {}).get(key, None))
                 else:
-                    return default.get(key, None)
+                    return (default or {}).get(key, None)
             else:
                 return settings
 
@@ -110,29 +187,51 @@ class Config:
         Throws:
         - ModelNotFoundException: If the combination of model name and provider does not map to any class.
         """
-        # Define a nested dictionary mapping providers to models and their respective classes
-        model_map = {
-            'openai': {
-                'gpt-3.5': GPT35,
-                'gpt-4': GPT4,
-                'gpt-4o': GPT4o,
-            },
-            'anthropic': {
-                'default': BaseAnthropic,  # Assuming a single class for any Anthropics' model
-            },
-            "ollama": {
-                "default": Ollama
-            }
-        }
-        
-        if provider not in model_map:
-            raise ModelNotFoundException(f"Provider '{provider}' not found.")
-        
         # For providers with a single class for all models, use a 'default' key
-        provider_models = model_map[provider]
-        model_class = provider_models.get(model_name, provider_models.get('default'))
-        
-        if model_class is None:
+        provider_models = MODEL_MAP.get(provider, {})
+        target = provider_models.get(model_name, provider_models.get('default'))
+
+        if target is None:
+            target = self.find_entry_point(provider, model_name)
+
+        if target is None:
+            if provider not in MODEL_MAP:
+                raise ModelNotFoundException(f"Provider '{provider}' not found.")
+
             raise ModelNotFoundException(f"Model '{model_name}' for provider '{provider}' not found.")
         
-        return model_class
\ No newline at end of file
+        return self.load_class(target)
+
+    def find_entry_point(self, provider: str, model_name: str):
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return None
+
+        eps = entry_points()
+        group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, 'select') else eps.get(ENTRY_POINT_GROUP, [])
+        found = {ep.name: ep for ep in group}
+
+        return found.get(f"{provider}/{model_name}", found.get(provider))
+
+    def load_class(self, target):
+        """
+        Imports a model class from a 'module.path:ClassName' string or an entry point.
+        """
+        if not isinstance(target, str):
+            try:
+                return target.load()
+            except ImportError as e:
+                raise ModelNotFoundException(f"Unable to load model entry point '{target.name}': {e}")
+
+        module_path, _, class_name = target.partition(':')
+
+        try:
+            module = importlib.import_module(module_path)
+        except ImportError as e:
+            raise ModelNotFoundException(f"Unable to import '{module_path}': {e}")
+
+        try:
+            return getattr(module, class_name)
+        except AttributeError:
+            raise ModelNotFoundException(f"'{module_path}' has no model class '{class_name}'")
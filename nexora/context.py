@@ -0,0 +1,68 @@
+import os
+import time
+
+from getpass import getuser
+
+class ContextProvider:
+    """
+    Supplies the system info rendered into the system prompt. Stable fields (username, current
+    directory and its listing) go into the system prompt, which stays byte-identical between
+    requests so provider-side prompt caching can reuse it. Volatile fields, like the current time,
+    are attached to the user's message instead.
+    """
+    def __init__(self, listing_limit=200):
+        self.listing_limit = listing_limit
+        self.username = getuser()
+
+        # Absolute path -> (directory mtime, rendered listing)
+        self._listings = {}
+
+    def listing(self, path="."):
+        """
+        Returns the directory listing of `path`, truncated to `listing_limit` entries with a
+        summary of the rest. Cached until the directory's mtime changes, i.e. entries are added,
+        removed or renamed.
+        """
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+
+        cached = self._listings.get(path)
+
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        names = [entry.name for entry in entries]
+
+        if self.listing_limit is not None and len(entries) > self.listing_limit:
+            rest = entries[self.listing_limit:]
+            dirs = sum(1 for entry in rest if entry.is_dir())
+
+            listing = f"{names[:self.listing_limit]} ... and {len(rest)} more entries ({dirs} directories, {len(rest) - dirs} files)"
+        else:
+            listing = str(names)
+
+        self._listings[path] = (mtime, listing)
+
+        return listing
+
+    def system_info(self):
+        """Fields for the system prompt template."""
+        return {
+            "username": self.username,
+            "current_directory": os.getcwd(),
+            "listing": self.listing("."),
+        }
+
+    def volatile_info(self):
+        return {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def annotate(self, txt):
+        """Prefixes a user message with the volatile fields."""
+        info = self.volatile_info()
+
+        return f"[Current time: {info['time']}]\n{txt}"
@@ -42,6 +42,7 @@ class Input:
         })
 
         self.exit_signal_count = 0
+        self.streamed = False
 
     def handle_sigint(self, signum, frame):
         if self.exit_signal_count == 0:
@@ -51,6 +52,17 @@ class Input:
             print('\nExiting...')
             exit()
 
+    def render_text(self, text):
+        # Print streamed response text as it arrives
+        self.streamed = True
+        print(text, end='', flush=True)
+
+    def print_response(self, response):
+        if self.streamed:
+            print()
+        else:
+            print(response.content)
+
     def get_user_input(self, style, display_cwd):
         user_input = ""
 
@@ -82,10 +94,11 @@ class Input:
 
             # Inject preload prompt if provided
             if preload_prompt:
-                response = self.logic.generate_response(preload_prompt)
+                self.streamed = False
+                response = self.logic.generate_response(preload_prompt, on_text=self.render_text)
                 
                 if response:
-                    print(response.content)
+                    self.print_response(response)
 
             while True:
                 cwd = os.getcwd()
@@ -105,7 +118,8 @@ class Input:
                         print_formatted_text(error_message, style=self.style_error)
                 else:
                     try:
-                        response = self.logic.generate_response(user_input)
+                        self.streamed = False
+                        response = self.logic.generate_response(user_input, on_text=self.render_text)
                     except ModelReturnError as e:
                         logger.traceback(f"Model return error: {e}")
                         error_message = FormattedText([
@@ -119,7 +133,7 @@ class Input:
 
                         continue
 
-                    print(response.content)
+                    self.print_response(response)
         except EOFError:
             logger.error("EOFError raised, exiting the program.")
             print("Exiting...")
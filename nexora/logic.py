@@ -1,10 +1,13 @@
 from nexora.logger import logger
 
+from nexora.context import ContextProvider
+from nexora import tokens
 from nexora.tools import Tools
+from nexora.tools.executor import ToolExecutor
 
 from nexora.models.base_model import BaseModel
-from nexora.models.openai.gpt35 import GPT35
-from nexora.models.anthropic import BaseAnthropic
+from nexora.models.stream import TextDelta, ToolCallReady, StreamEnd
+from nexora.models.compaction import Compactor
 
 from nexora.messages.base_message import BaseMessage
 from nexora.messages.system import System
@@ -14,11 +17,9 @@ from nexora.messages.response import Response
 
 from nexora.exceptions import *
 
+import asyncio
+import atexit
 import json
-import os
-import time
-
-from getpass import getuser
 
 from prompt_toolkit import print_formatted_text
 from prompt_toolkit.formatted_text import FormattedText
@@ -29,51 +30,157 @@ class Logic:
         self.app = app
         self.model = model
         self.model.tools = Tools(self.model.ToolReturn)
+        self.executor = ToolExecutor(self.model.tools, app)
+        self.context = ContextProvider(listing_limit=app.config.get("context.listing_limit"))
+
+        # One loop for the whole session, so pooled async connections stay open between turns
+        self.loop = asyncio.new_event_loop()
+        atexit.register(self.close)
+
+        if app.config.get("compaction.enabled"):
+            self.model.compactor = Compactor(
+                max_tokens=app.config.get("compaction.max_tokens"),
+                keep_recent=app.config.get("compaction.keep_recent"),
+                max_tool_return_tokens=app.config.get("compaction.max_tool_return_tokens"),
+                summarize=app.config.get("compaction.summarize")
+            )
+
+    def generate_response(self, txt, on_text=None):
+        """
+        Runs the model, and any tools it calls, until it produces a final response. If `on_text`
+        is given and the model streams, it's called with each piece of text as it arrives.
+        """
+        task = self.loop.create_task(self.agenerate_response(txt, on_text=on_text))
+
+        try:
+            return self.loop.run_until_complete(task)
+        except BaseException:
+            # e.g. Ctrl+C; don't leave the turn running into the next one
+            task.cancel()
+
+            try:
+                self.loop.run_until_complete(task)
+            except BaseException:
+                pass
+
+            raise
+
+    def close(self):
+        """Finalizes the async generators left behind by streamed responses and closes the loop."""
+        if self.loop.is_closed():
+            return
 
-    def generate_response(self, txt):
-        self.model.add_message(User(txt))
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
+
+    async def agenerate_response(self, txt, on_text=None):
+        """
+        The model call, tool calls and text rendering of generate_response, run on the event
+        loop: model I/O goes through the provider's async client, and tool calls run on threads.
+        """
+        loop = asyncio.get_running_loop()
+
+        prompt = User(self.context.annotate(txt))
+        self.model.add_message(prompt)
 
         while True:
+            # `time` is still passed for custom templates that include it
             self.model.system_prompt = self.model.system_prompt_template.format(
-                time=time.strftime("%Y-%m-%d %H:%M:%S"),
-                current_directory=os.getcwd(),
-                listing=str(os.listdir(".")),
-                username=getuser()
+                **self.context.system_info(),
+                **self.context.volatile_info()
             )
 
-            response = self.model.generate_response()
+            # Compaction may have the model summarize with a blocking call, so keep it off the loop
+            try:
+                await loop.run_in_executor(None, self.check_budget)
+            except ModelReturnError:
+                # Drop a prompt that doesn't fit, or every later turn would be refused too
+                if self.model._messages and self.model._messages[-1] is prompt:
+                    self.model._messages.pop()
+
+                raise
 
-            if response.finish_reason == "tool_calls":
-                logger.debug("finish_reason == tool_calls")
+            if on_text and self.model.stream:
+                response, batch = await self.astream_response(on_text)
+            else:
+                response, batch = await self.model.agenerate_response(), None
 
-                if response.content:
-                    print(response.content)
-                
-                tool_calls = response.tool_calls
- 
-                for tool_call in tool_calls:
-                    call_id = tool_call.id
-                    tool_type = tool_call.type
+            # Streamed tool calls have already started, so they're answered even if the
+            # response finished for another reason, e.g. "length"
+            if response.tool_calls:
+                logger.debug(f"{len(response.tool_calls)} tool calls, finish_reason == {response.finish_reason}")
 
-                    logger.debug(f"<call_id={call_id}, tool_type={tool_type}>")
- 
-                    if tool_type == "function":
-                        func = tool_call.content
-                        func_name = func.name
-                        func_kwargs = json.loads(func.arguments)
+                if batch is None:
+                    if response.content:
+                        print(response.content)
 
-                        logger.debug(f"<func={func}, func_name={func_name}, func_kwargs={func_kwargs}>")
+                    batch = self.executor.batch()
 
-                        tool_return = self.model.tools.call(
-                            name=func_name,
-                            call_id=call_id,
-                            app=self.app,
-                            kwargs=func_kwargs
-                        )
+                    for tool_call in response.tool_calls:
+                        self.submit_tool_call(batch, tool_call)
 
-                        self.model.add_message(tool_return)
-                    else:
-                        raise Exception(f"Invalid tool_type {tool_type}")
+                # Held calls may prompt for permission, which can't run on a thread with a
+                # running loop. Tool returns are appended in call order, as providers expect
+                for tool_return in await loop.run_in_executor(None, batch.wait):
+                    self.model.add_message(tool_return)
 
             else:
                 return response
+
+    def check_budget(self):
+        request_size = tokens.request_tokens(self.model)
+
+        logger.debug(f"Request size: ~{request_size} tokens")
+
+        if self.model.max_input_tokens and request_size > self.model.max_input_tokens:
+            raise ModelReturnError(f"Request of ~{request_size} tokens exceeds max_input_tokens ({self.model.max_input_tokens})")
+
+    async def astream_response(self, on_text):
+        """
+        Streams a response, rendering text through `on_text` and starting tool calls as soon as
+        their arguments are complete. Returns the response and the batch of started tool calls.
+        """
+        batch = self.executor.batch()
+        response = None
+        streamed_text = False
+
+        async for event in self.model.astream_response():
+            if isinstance(event, TextDelta):
+                streamed_text = True
+                on_text(event.text)
+            elif isinstance(event, ToolCallReady):
+                if streamed_text:
+                    # Keep tool call output off the line the text ended on
+                    on_text("\n")
+                    streamed_text = False
+
+                self.submit_tool_call(batch, event.tool_call)
+            elif isinstance(event, StreamEnd):
+                response = event.response
+
+        return response, batch
+
+    def submit_tool_call(self, batch, tool_call):
+        try:
+            batch.submit(*self.parse_tool_call(tool_call))
+        except json.JSONDecodeError as e:
+            # e.g. arguments cut off when the response hit its length limit
+            logger.error(f"Malformed arguments for {tool_call.content.name}: {e}")
+            batch.fail(tool_call.content.name, tool_call.id, f"Tool call failed: its arguments aren't valid JSON ({e}); the response may have been cut off")
+
+    def parse_tool_call(self, tool_call):
+        call_id = tool_call.id
+        tool_type = tool_call.type
+
+        logger.debug(f"<call_id={call_id}, tool_type={tool_type}>")
+
+        if tool_type != "function":
+            raise Exception(f"Invalid tool_type {tool_type}")
+
+        func = tool_call.content
+        func_name = func.name
+        func_kwargs = json.loads(func.arguments)
+
+        logger.debug(f"<func={func}, func_name={func_name}, func_kwargs={func_kwargs}>")
+
+        return func_name, call_id, func_kwargs
@@ -1,6 +1,43 @@
+import functools
+
+def memoize_serialize(serialize):
+    """
+    Caches the result of a message class's `serialize`. Results are cached per implementation,
+    so each provider's message class keeps its own serialized form. The cache is dropped when an
+    attribute of the message is reassigned; the returned dict is shared and must not be modified.
+    """
+    @functools.wraps(serialize)
+    def wrapper(self):
+        cache = self.__dict__.get("_serialized")
+
+        if cache is None:
+            cache = self._serialized = {}
+
+        if serialize not in cache:
+            cache[serialize] = serialize(self)
+
+        return cache[serialize]
+
+    return wrapper
+
 class BaseMessage:
     def __init__(self, content: str):
         self.content = content
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if "serialize" in cls.__dict__:
+            cls.serialize = memoize_serialize(cls.__dict__["serialize"])
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+
+        # Drop values derived from the message, like its token count, when it changes
+        if not name.startswith("_"):
+            self.__dict__.pop("_token_count", None)
+            self.__dict__.pop("_serialized", None)
+            self.__dict__.pop("_translations", None)
+
     def serialize(self) -> dict:
         raise NotImplementedError("This method should be implemented by subclasses.")
@@ -7,6 +7,8 @@ from nexora.messages.tool_call import ToolCall
 from nexora.types.function import Function
 
 from nexora.models.base_model import BaseModel
+from nexora.models.stream import TextDelta, ToolCallReady, StreamEnd, build_tool_call
+from nexora.models.pool import PooledClients
 
 from .messages.tool_return import ToolReturn
 from .messages.assistant import Assistant
@@ -30,13 +32,55 @@ from anthropic.types import (
     MessageStreamEvent,
     TextBlock,
     TextBlockParam,
-    TextDelta,
     ToolUseBlock
 )
 
 import anthropic
 
-class BaseAnthropic(BaseModel):
+CACHE_CONTROL = {"type": "ephemeral"}
+
+class MessageStream:
+    """
+    Turns the events of a streamed Messages API response into stream events, building up the
+    Assistant message as it goes. Used by both the blocking and the async streams.
+    """
+    def __init__(self, asst):
+        self.asst = asst
+        self.tool_calls = []
+        self.usage = None
+
+        # Tool use blocks being received, by content block index
+        self.blocks = {}
+
+    def feed(self, event):
+        """Returns the events of one streamed event."""
+        if event.type == "message_start":
+            # Input and cache token counts arrive up front, output tokens with message_delta
+            self.usage = event.message.usage
+        elif event.type == "message_delta" and event.usage:
+            self.usage.output_tokens = event.usage.output_tokens
+        elif event.type == "content_block_start" and event.content_block.type == "tool_use":
+            self.blocks[event.index] = {
+                "id": event.content_block.id,
+                "name": event.content_block.name,
+                "input": ""
+            }
+        elif event.type == "content_block_delta":
+            if event.delta.type == "text_delta":
+                self.asst.content += event.delta.text
+                return [TextDelta(event.delta.text)]
+            elif event.delta.type == "input_json_delta" and event.index in self.blocks:
+                self.blocks[event.index]["input"] += event.delta.partial_json
+        elif event.type == "content_block_stop" and event.index in self.blocks:
+            block = self.blocks.pop(event.index)
+            tool_call = build_tool_call(block["id"], block["name"], block["input"])
+
+            self.tool_calls.append(tool_call)
+            return [ToolCallReady(tool_call)]
+
+        return []
+
+class BaseAnthropic(PooledClients, BaseModel):
     ToolReturn = ToolReturn
     Assistant = Assistant
 
@@ -52,70 +96,123 @@ class BaseAnthropic(BaseModel):
 
     system_prompt_template = SYSTEM_PROMPT
 
+    # Mark the system prompt, tools and conversation so far as cacheable
+    prompt_caching = True
+
     def __init__(self):
         super().__init__()
 
-        self.client = None
+        # Token totals for the session, including prompt cache reads and writes
+        self.usage = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
 
     @property
     def messages(self):
         # Override the injection of a System prompt here; 
         # it's passed as an argument to .create() and not needed
-        return self._messages
+        return self.compacted_messages()
 
     @property
     def _tools(self):
-        tools = []
+        return self.tools.render("anthropic") if self.tools else []
 
-        for tool in self.tools.__obj__:
-            function = tool["function"]
+    def _cache_breakpoints(self, system, tools, messages):
+        """
+        Places cache breakpoints on the system prompt, the last tool definition and the last
+        message. The breakpoint on the last message moves forward every turn, and the next request
+        reads back everything up to it. The serialized objects are copied, not modified.
+        """
+        system = [{"type": "text", "text": system, "cache_control": CACHE_CONTROL}]
 
-            tools.append({
-                "name": function["name"],
-                "description": function["description"],
-                "input_schema": function["parameters"]
-            })
+        if tools:
+            tools = tools[:-1] + [{**tools[-1], "cache_control": CACHE_CONTROL}]
 
-        return tools
+        if messages:
+            last = messages[-1]
+            content = last["content"]
 
-    def generate_response(self):
-        if not self.client:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content}]
 
-        serialized_messages = [msg.serialize() for msg in self.messages]
+            content = content[:-1] + [{**content[-1], "cache_control": CACHE_CONTROL}]
+            messages = messages[:-1] + [{**last, "content": content}]
 
-        asst = self.Assistant("")
-        asst.model = self.model
+        return system, tools, messages
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                messages=serialized_messages,
-                system=self.system_prompt,
-                tools=self._tools,
-                temperature=self.temperature
-            )
-
-            logger.debug(response)
-        except anthropic.RateLimitError as e:
-            raise ModelReturnError(f"RateLimitError: {e}")
-        except anthropic.BadRequestError as e:
+    def _record_usage(self, usage):
+        for key in self.usage:
+            self.usage[key] += getattr(usage, key, None) or 0
 
-            logger.error("**DEBUGGING***")
-            logger.error("*" * 16)
-            logger.error(self.messages)
-            logger.error("*" * 4)
+        logger.debug(
+            f"Anthropic usage: input={getattr(usage, 'input_tokens', None)}, "
+            f"output={getattr(usage, 'output_tokens', None)}, "
+            f"cache_write={getattr(usage, 'cache_creation_input_tokens', None)}, "
+            f"cache_read={getattr(usage, 'cache_read_input_tokens', None)}"
+        )
 
-            for msg in self.messages:
-                logger.error(f"--- {msg.serialize()}")
-                
-            logger.error("*" * 16)
+    def _request_kwargs(self, **kwargs):
+        serialized_messages = self.serialize_messages(self.messages)
+        system = self.system_prompt
+        tools = self._tools
+
+        if self.prompt_caching:
+            system, tools, serialized_messages = self._cache_breakpoints(system, tools, serialized_messages)
+
+        if tools:
+            kwargs.update(tools=tools)
+
+        return dict(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=serialized_messages,
+            system=system,
+            temperature=self.temperature,
+            **kwargs
+        )
+
+    def _request_error(self, e):
+        logger.error("**DEBUGGING***")
+        logger.error("*" * 16)
+        logger.error(self.messages)
+        logger.error("*" * 4)
+
+        for msg in self.messages:
+            logger.error(f"--- {msg.serialize()}")
             
-            raise ModelReturnError(f"BadRequestError: {e}")
+        logger.error("*" * 16)
         
-        # logger.debug("Appending assistant object to messages")
-        self.add_message(asst)
+        return ModelReturnError(f"BadRequestError: {e}")
+
+    def _request(self, **kwargs):
+        client = self._client(anthropic.Anthropic, anthropic.DefaultHttpxClient)
+
+        # Rate limit and overload errors are retried by the scheduler
+        try:
+            return self.scheduler.call(client.messages.create, tokens=self._request_tokens(), **self._request_kwargs(**kwargs))
+        except anthropic.BadRequestError as e:
+            raise self._request_error(e)
+
+    async def _arequest(self, **kwargs):
+        client = self._async_client(anthropic.AsyncAnthropic, anthropic.DefaultAsyncHttpxClient)
+
+        try:
+            return await self.scheduler.acall(client.messages.create, tokens=self._request_tokens(), **self._request_kwargs(**kwargs))
+        except anthropic.BadRequestError as e:
+            raise self._request_error(e)
+
+    def _parse_response(self, response):
+        logger.debug(response)
+
+        self._record_usage(response.usage)
+
+        asst = self.Assistant("")
+        asst.model = self.model
+
+        tool_calls = []
 
         for block in response.content:
             if type(block) == ToolUseBlock:
@@ -124,26 +221,56 @@ class BaseAnthropic(BaseModel):
                     arguments=block.input
                 ) 
                 
-                tool_call = ToolCall(
+                tool_calls.append(ToolCall(
                     content=func,
                     type="function",
                     id=block.id
-                )
+                ))
+            elif type(block) == TextBlock:
+                asst.content += block.text
 
-                asst.tool_calls.append(tool_call)
+        asst.tool_calls = tool_calls
+
+        self.add_message(asst)
 
-                content = ""
-            elif type(block) == TextBlock:
-                if not asst.content:
-                    asst.content = ""
-                    
-                asst.content += response.content[0].text
-
-        # if len(asst.content) < 1:
-        #     try:
-        #         logger.debug("Removing stale assistant object from messages")
-        #         self.messages.remove(asst)
-        #     except:
-        #         pass
-        
         return asst
+
+    def generate_response(self):
+        return self._parse_response(self._request())
+
+    async def agenerate_response(self):
+        return self._parse_response(await self._arequest())
+
+    def _finish_stream(self, stream):
+        self._record_usage(stream.usage)
+
+        stream.asst.tool_calls = stream.tool_calls
+
+        self.add_message(stream.asst)
+
+        return StreamEnd(stream.asst)
+
+    def _new_stream(self):
+        asst = self.Assistant("")
+        asst.model = self.model
+
+        return MessageStream(asst)
+
+    def stream_response(self):
+        stream = self._new_stream()
+
+        for event in self._request(stream=True):
+            yield from stream.feed(event)
+
+        yield self._finish_stream(stream)
+
+    async def astream_response(self):
+        stream = self._new_stream()
+
+        # Closing the response explicitly returns its connection to the pool
+        async with await self._arequest(stream=True) as response:
+            async for event in response:
+                for stream_event in stream.feed(event):
+                    yield stream_event
+
+        yield self._finish_stream(stream)
@@ -1,5 +1,7 @@
 from nexora.messages.assistant import Assistant
 
+import json
+
 class Assistant(Assistant):
     @property
     def finish_reason(self):
@@ -21,12 +23,17 @@ class Assistant(Assistant):
         if len(self.tool_calls) > 0:
 
             for tool_call in self.tool_calls:
+                try:
+                    arguments = json.loads(tool_call.content.arguments or "{}")
+                except json.JSONDecodeError:
+                    # Arguments cut off mid-stream; the call itself was answered with an error
+                    arguments = {}
 
                 content.append({
                     "type": "tool_use",
                     "id": tool_call.id,
                     "name": tool_call.content.name,
-                    "input": {}
+                    "input": arguments
                 })
                 
         
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict
 
+import asyncio
+
 from nexora.messages.base_message import BaseMessage
 from nexora.messages.system import System
 from nexora.messages.user import User
@@ -10,6 +12,12 @@ from nexora.messages.tool_return import ToolReturn
 from nexora.messages.response import Response
 
 from .system_prompt import SYSTEM_PROMPT
+from .stream import TextDelta, ToolCallReady, StreamEnd
+from .compaction import SUMMARY_SYSTEM_PROMPT, SUMMARY_PROMPT, render_transcript
+from .scheduler import get_scheduler
+
+from nexora import tokens
+from nexora.exceptions import ModelReturnError
 
 class BaseModel(ABC):
     System = System
@@ -27,24 +35,141 @@ class BaseModel(ABC):
     has_vision = False
     has_tools = False
 
+    # Stream responses token by token; can be turned off per provider/model in the config
+    stream = True
+
+    # Refuse to send requests estimated above this many input tokens
+    max_input_tokens = None
+
+    # Requests and tokens per minute allowed by the provider, e.g.
+    # {"requests_per_minute": 500, "tokens_per_minute": 30000}; unlimited by default
+    rate_limits = None
+
+    # Times a request failing with a rate limit, server or connection error is retried
+    max_retries = 5
+
     def __init__(self):
         self._messages = []
         self.system_prompt = ""
 
+        # Optional Compactor, applied whenever the messages are read
+        self.compactor = None
+
+        self._system_message = None
+
+        # Messages last serialized, and their serialized forms
+        self._serialized_source = []
+        self._serialized = []
+
     def __str__(self):
         return None
 
+    @property
+    def scheduler(self):
+        """The request scheduler of the model's provider; see `scheduler.RequestScheduler`."""
+        return get_scheduler(self.provider, self.rate_limits, self.max_retries)
+
+    def _request_tokens(self) -> int:
+        # Only estimated when tokens per minute are limited
+        return tokens.request_tokens(self) if self.scheduler.tokens else 0
+
     @abstractmethod
     def generate_response(self):
         pass
 
+    def stream_response(self):
+        """
+        Yields TextDelta events as text arrives and ToolCallReady events as soon as a tool call's
+        arguments are complete, ending with a StreamEnd carrying the full response. Models that
+        can't stream fall back on a single generate_response call.
+        """
+        response = self.generate_response()
+
+        if response.content:
+            yield TextDelta(response.content)
+
+        for tool_call in response.tool_calls:
+            yield ToolCallReady(tool_call)
+
+        yield StreamEnd(response)
+
+    async def agenerate_response(self):
+        """
+        Async variant of generate_response. Providers with an async client override this;
+        otherwise the blocking call runs on a worker thread, so the event loop isn't held up.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.generate_response)
+
+    async def astream_response(self):
+        """Async variant of stream_response, falling back on a single agenerate_response call."""
+        response = await self.agenerate_response()
+
+        if response.content:
+            yield TextDelta(response.content)
+
+        for tool_call in response.tool_calls:
+            yield ToolCallReady(tool_call)
+
+        yield StreamEnd(response)
+
+    def summarize(self, messages) -> str:
+        """
+        Has the model summarize `messages`, without touching the conversation history. The
+        request is sent without tools, so the model can only answer in text.
+        """
+        history, system_prompt, tools = self._messages, self.system_prompt, getattr(self, "tools", None)
+
+        self._messages = [self.User(SUMMARY_PROMPT.format(transcript=render_transcript(messages)))]
+        self.system_prompt = SUMMARY_SYSTEM_PROMPT
+        self.tools = None
+
+        try:
+            summary = self.generate_response().content
+        finally:
+            self._messages, self.system_prompt, self.tools = history, system_prompt, tools
+
+        if not summary:
+            raise ModelReturnError("The model returned an empty summary")
+
+        return summary
+
     def add_message(self, message: BaseMessage):
         self._messages.append(message)
 
+    def compacted_messages(self):
+        if self.compactor:
+            self.compactor.compact(self)
+
+        return self._messages
+
+    def serialize_messages(self, messages) -> list:
+        """
+        Serializes `messages`, reusing the serialized history of the previous request for the
+        messages it has in common with it, so a new turn only serializes what was appended.
+        """
+        source, serialized = self._serialized_source, self._serialized
+        common = 0
+        limit = min(len(source), len(messages))
+
+        while common < limit and source[common] is messages[common]:
+            common += 1
+
+        del source[common:]
+        del serialized[common:]
+
+        for message in messages[common:]:
+            source.append(message)
+            serialized.append(message.serialize())
+
+        return list(serialized)
+
     @property
     def messages(self):
-        # Automatically inject system prompt
-        return [System(self.system_prompt)] + self._messages
+        # Automatically inject system prompt, reusing the message while the prompt is unchanged
+        if self._system_message is None or self._system_message.content != self.system_prompt:
+            self._system_message = System(self.system_prompt)
+
+        return [self._system_message] + self.compacted_messages()
     
     @messages.setter
     def messages(self, _):
@@ -0,0 +1,64 @@
+from nexora.messages.assistant import Assistant
+from nexora.messages.tool_call import ToolCall
+from nexora.messages.response import Response
+
+from .base_model import BaseModel
+from .stream import StreamEnd, ChatCompletionStream
+
+class ChatCompletionModel(BaseModel):
+    """
+    Parses and streams responses in the OpenAI Chat Completions format, as returned by the
+    OpenAI SDK and by LiteLLM. Subclasses implement `_request` and `_arequest`.
+    """
+    def _finish(self, content, tool_calls, finish_reason) -> Response:
+        # Tool calls are kept whatever the finish reason (e.g. "length" or "stop"), since
+        # they've already been started and each needs its tool return in the history
+        self.add_message(Assistant(content, tool_calls))
+
+        return Response(content=content, model=self.model, tool_calls=tool_calls, finish_reason=finish_reason)
+
+    def _parse_response(self, response) -> Response:
+        choice = response.choices[0]
+
+        content = choice.message.content
+        finish_reason = choice.finish_reason
+
+        # Parse tool calls from the response
+        tool_calls = [
+            ToolCall(content=data.function, id=data.id, type=data.type) for data in choice.message.tool_calls or []
+        ]
+
+        return self._finish(content, tool_calls, finish_reason)
+
+    def generate_response(self) -> Response:
+        return self._parse_response(self._request())
+
+    async def agenerate_response(self) -> Response:
+        return self._parse_response(await self._arequest())
+
+    def stream_response(self):
+        stream = ChatCompletionStream()
+
+        for chunk in self._request(stream=True):
+            yield from stream.feed(chunk)
+
+        yield from stream.finish()
+        yield StreamEnd(self._finish(stream.content, stream.tool_calls, stream.finish_reason))
+
+    async def astream_response(self):
+        stream = ChatCompletionStream()
+        response = await self._arequest(stream=True)
+
+        try:
+            async for chunk in response:
+                for event in stream.feed(chunk):
+                    yield event
+        finally:
+            # Closing the response explicitly returns its connection to the pool
+            # (LiteLLM's stream wrapper has aclose, the OpenAI SDK's stream an async close)
+            await (getattr(response, "aclose", None) or response.close)()
+
+        for event in stream.finish():
+            yield event
+
+        yield StreamEnd(self._finish(stream.content, stream.tool_calls, stream.finish_reason))
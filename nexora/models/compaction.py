@@ -0,0 +1,120 @@
+from nexora.logger import logger
+from nexora.tokens import message_tokens, count_tokens
+
+from nexora.messages.user import User
+from nexora.messages.tool_return import ToolReturn
+
+SUMMARY_SYSTEM_PROMPT = "You summarize conversations between a user and an AI assistant working in a Linux shell. Do not call any tools."
+
+SUMMARY_PROMPT = """Summarize the conversation below so the assistant can continue the work without it. Keep the user's goals and instructions, decisions made, files and commands involved and their important results, and anything still left to do. Be concise.
+
+{transcript}"""
+
+def render_transcript(messages, limit=2000) -> str:
+    lines = []
+
+    for message in messages:
+        content = str(message.content or "")
+
+        if len(content) > limit:
+            content = content[:limit] + " [...]"
+
+        if isinstance(message, ToolReturn):
+            lines.append(f"TOOL RESULT ({message.name}): {content}")
+        else:
+            lines.append(f"{type(message).__name__.upper()}: {content}")
+
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            lines.append(f"TOOL CALL: {tool_call.content.name}({str(tool_call.content.arguments)[:limit]})")
+
+    return "\n".join(lines)
+
+class Compactor:
+    """
+    Keeps a model's history within a token budget. Large tool returns outside the most recent
+    `keep_recent` messages are cut down to their head and tail; once the history is estimated
+    above `max_tokens`, the oldest turns are replaced with a summary written by the model itself.
+    History is only ever cut at a user message, so a tool call is never separated from its return.
+    """
+    def __init__(self, max_tokens=100000, keep_recent=6, max_tool_return_tokens=2000, summarize=True):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.max_tool_return_tokens = max_tool_return_tokens
+        self.summarize = summarize
+
+        self._active = False
+
+    def compact(self, model):
+        # Summarizing calls the model, which reads its messages again
+        if self._active:
+            return
+
+        self._active = True
+
+        try:
+            self.elide_tool_returns(model)
+
+            if self.summarize and self.total_tokens(model._messages) > self.max_tokens:
+                self.summarize_turns(model)
+        finally:
+            self._active = False
+
+    def total_tokens(self, messages) -> int:
+        return sum(message_tokens(message) for message in messages)
+
+    def elide_tool_returns(self, model):
+        messages = model._messages
+        stale = len(messages) - self.keep_recent
+
+        for index in range(max(stale, 0)):
+            message = messages[index]
+
+            # An elided result can still be a little over the limit with its marker; it's never elided twice
+            if not isinstance(message, ToolReturn) or message.__dict__.get("_elided") or message_tokens(message) <= self.max_tool_return_tokens:
+                continue
+
+            content = str(message.content)
+
+            # Keep roughly max_tool_return_tokens worth of characters
+            limit = len(content) * self.max_tool_return_tokens // max(count_tokens(content), 1)
+            elided = len(content) - limit
+
+            content = f"{content[:limit // 2]}\n[... {elided} characters elided from this old tool result ...]\n{content[-limit // 2:]}"
+
+            messages[index] = type(message)(content=content, name=message.name, id=message.id, error=message.error)
+            messages[index]._elided = True
+
+    def summarize_turns(self, model):
+        messages = model._messages
+        target = self.max_tokens // 2
+
+        # Find the earliest user message after which the history fits in half the budget
+        boundary = None
+        remaining = self.total_tokens(messages)
+
+        for index, message in enumerate(messages):
+            if index > 0 and isinstance(message, User) and remaining <= target:
+                boundary = index
+                break
+
+            remaining -= message_tokens(message)
+
+        if boundary is None:
+            # Fall back on keeping only the current turn
+            boundary = max((index for index, message in enumerate(messages) if isinstance(message, User)), default=0)
+
+        if boundary == 0:
+            return
+
+        try:
+            summary = model.summarize(messages[:boundary])
+        except Exception as e:
+            logger.error(f"Unable to summarize conversation history: {e}")
+            return
+
+        logger.debug(f"Summarized {boundary} messages into {len(summary)} characters")
+
+        model._messages = [
+            model.User(f"Summary of the earlier conversation:\n{summary}"),
+            model.Assistant("Understood. I'll continue from this summary."),
+        ] + messages[boundary:]
@@ -1,19 +1,14 @@
-from nexora.models.base_model import BaseModel
+from nexora.models.chat_completion import ChatCompletionModel
 from nexora.logger import logger
 from nexora.exceptions import ModelReturnError
 
-from nexora.messages.assistant import Assistant
-from nexora.messages.tool_call import ToolCall
-from nexora.messages.tool_return import ToolReturn
-from nexora.messages.response import Response
-
 from .system_prompt import SYSTEM_PROMPT
 
-from litellm import completion
+from litellm import completion, acompletion
 
 import json
 
-class Ollama(BaseModel):
+class Ollama(ChatCompletionModel):
     provider = "ollama"
     model = None
 
@@ -41,49 +36,39 @@ class Ollama(BaseModel):
 
     #     return SYSTEM_PROMPT + "\n\n" + tool_prompt
 
-    def generate_response(self):
-        serialized_messages = [message.serialize() for message in self.messages]
+    def _request_kwargs(self, **kwargs):
+        # Serialized messages are cached and shared, so LiteLLM gets copies it may modify
+        serialized_messages = [dict(message) for message in self.serialize_messages(self.messages)]
+
+        if self.tools:
+            kwargs.update(tools=self.tools.__obj__)
+
+        return dict(
+            model=f"ollama_chat/{self.model}",
+            messages=serialized_messages,
+            api_base=self.api_base,
+            **kwargs
+        )
+
+    def _request(self, **kwargs):
+        try:
+            response = self.scheduler.call(completion, tokens=self._request_tokens(), **self._request_kwargs(**kwargs))
+
+            logger.debug(response)
+        except Exception as e:
+            logger.error(f"Error while making request to Ollama: {e}")
+            raise ModelReturnError(f"Error making request to Ollama: {e}")
+
+        return response
 
+    async def _arequest(self, **kwargs):
+        # LiteLLM keeps its own pooled async HTTP clients
         try:
-            response = completion(
-                model=f"ollama_chat/{self.model}",
-                messages=serialized_messages,
-                api_base=self.api_base,
-                tools=self.tools.__obj__
-            )
+            response = await self.scheduler.acall(acompletion, tokens=self._request_tokens(), **self._request_kwargs(**kwargs))
 
             logger.debug(response)
         except Exception as e:
             logger.error(f"Error while making request to Ollama: {e}")
             raise ModelReturnError(f"Error making request to Ollama: {e}")
-        
-        choice = response.choices[0]
-        
-        content = choice.message["content"]
-        finish_reason = choice.finish_reason
-
-        # # Parse tool calls from the response
-        # try:
-        #     tool_calls = tool_parser(content)
-        # except Exception as e:
-        #     logger.error(f"Error while parsing for potential tool calls {e}")
-        #     logger.debug(content)
-        #     raise ModelReturnError(f"Error while parsing for potential tool calls: {e}")
-
-        tool_calls = []
-
-        if finish_reason == "tool_calls":
-            tool_calls_data = response.choices[0].message.tool_calls
-
-            tool_calls = [
-                ToolCall(content=data.function, id=data.id, type=data.type) for data in tool_calls_data
-            ]
-
-            msg = Assistant(content)
-            msg.tool_calls = tool_calls
-
-            self.add_message(msg)
-        else:
-            self.add_message(Assistant(content))
-            
-        return Response(content=content, model=self.model, tool_calls=tool_calls, finish_reason=finish_reason)
+
+        return response
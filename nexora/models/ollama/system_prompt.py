@@ -6,5 +6,4 @@ MY GOAL is to execute each prompt or task iteratively until its intended goal is
 User's username: {username} 
 Current directory: {current_directory}
 Listing of directories/files: {listing}
-Current time: {time}
 """
\ No newline at end of file
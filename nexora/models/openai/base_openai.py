@@ -6,14 +6,15 @@ from nexora.messages.tool_call import ToolCall
 from nexora.messages.tool_return import ToolReturn
 from nexora.messages.response import Response
 
-from ..base_model import BaseModel
+from ..chat_completion import ChatCompletionModel
+from ..pool import PooledClients
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
 from typing import List
 
 import json
 
-class BaseOpenAI(BaseModel):
+class BaseOpenAI(PooledClients, ChatCompletionModel):
     provider="openai"
     model = None
 
@@ -23,44 +24,25 @@ class BaseOpenAI(BaseModel):
     def __init__(self):
         super().__init__()
 
-        self.client = None
-
     def __str__(self):
         return self.model
 
-    def generate_response(self) -> Response:
-        if not self.client:
-            self.client = OpenAI(api_key=self.api_key)
-            
-        serialized_messages = [message.serialize() for message in self.messages]
+    def _request_kwargs(self, **kwargs):
+        if self.tools:
+            kwargs.update(tools=self.tools.__obj__, tool_choice="auto")
 
-        response = self.client.chat.completions.create(
+        return dict(
             model=self.model,
-            messages=serialized_messages,
-            tools=self.tools.__obj__,
-            tool_choice="auto",
+            messages=self.serialize_messages(self.messages),
+            **kwargs
         )
-        
-        choice = response.choices[0]
-        
-        content = choice.message.content
-        finish_reason = choice.finish_reason
-
-        # Parse tool calls from the response
-        tool_calls = []
 
-        if finish_reason == "tool_calls":
-            tool_calls_data = response.choices[0].message.tool_calls
+    def _request(self, **kwargs):
+        client = self._client(OpenAI, DefaultHttpxClient)
 
-            tool_calls = [
-                ToolCall(content=data.function, id=data.id, type=data.type) for data in tool_calls_data
-            ]
+        return self.scheduler.call(client.chat.completions.create, tokens=self._request_tokens(), **self._request_kwargs(**kwargs))
 
-            msg = Assistant(content)
-            msg.tool_calls = tool_calls
+    async def _arequest(self, **kwargs):
+        client = self._async_client(AsyncOpenAI, DefaultAsyncHttpxClient)
 
-            self.add_message(msg)
-        else:
-            self.add_message(Assistant(content))
-            
-        return Response(content=content, model=self.model, tool_calls=tool_calls, finish_reason=finish_reason)
+        return await self.scheduler.acall(client.chat.completions.create, tokens=self._request_tokens(), **self._request_kwargs(**kwargs))
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import weakref
+
+# Shared HTTP clients, one per client class. Providers pass their SDK's DefaultHttpxClient
+# or DefaultAsyncHttpxClient (which carry the SDK's pool limits and timeouts, and match the
+# httpx package it was built against), so every model of a provider reuses the same
+# connections instead of each SDK client keeping its own pool.
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Async connections belong to the event loop they were opened on, so there's one set per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_http_client(client_class):
+    with _clients_lock:
+        if client_class not in _clients:
+            _clients[client_class] = client_class()
+
+        return _clients[client_class]
+
+def get_async_http_client(client_class):
+    """Returns the shared async client of the running event loop."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+
+    if client_class not in clients:
+        clients[client_class] = client_class()
+
+    return clients[client_class]
+
+class PooledClients:
+    """
+    Creates a model's SDK clients on the shared connection pools. Retries are left to the
+    scheduler, so the clients are created without their own.
+    """
+    client = None
+    async_client = None
+
+    # The connection pool the async client was created with
+    _async_http_client = None
+
+    def _client(self, client_class, http_client_class):
+        if not self.client:
+            self.client = client_class(api_key=self.api_key, http_client=get_http_client(http_client_class), max_retries=0)
+
+        return self.client
+
+    def _async_client(self, client_class, http_client_class):
+        http_client = get_async_http_client(http_client_class)
+
+        # The async client is bound to the connection pool of the loop it was created on
+        if not self.async_client or self._async_http_client is not http_client:
+            self.async_client = client_class(api_key=self.api_key, http_client=http_client, max_retries=0)
+            self._async_http_client = http_client
+
+        return self.async_client
@@ -0,0 +1,307 @@
+from nexora.logger import logger
+from nexora.exceptions import ModelReturnError, ModelNotFoundException
+
+from nexora.messages.user import User
+from nexora.messages.assistant import Assistant
+from nexora.messages.tool_return import ToolReturn
+
+from .base_model import BaseModel
+from .stream import StreamEnd
+
+import asyncio
+
+POLICIES = ("fallback", "race")
+
+def translate_tool_call(tool_call, model):
+    if type(tool_call) is model.ToolCall:
+        return tool_call
+
+    return model.ToolCall(tool_call.content, tool_call.type, tool_call.id)
+
+def translate(message, model):
+    """
+    Returns `message` as an instance of `model`'s class for that kind of message, so it
+    serializes in the model's format. Translations are cached on the message, and dropped
+    along with its other derived values when it changes.
+    """
+    if isinstance(message, ToolReturn):
+        cls = model.ToolReturn
+    elif isinstance(message, Assistant):
+        cls = model.Assistant
+    elif isinstance(message, User):
+        cls = model.User
+    else:
+        return message
+
+    if type(message) is cls:
+        return message
+
+    cache = message.__dict__.get("_translations")
+
+    if cache is None:
+        cache = message._translations = {}
+
+    if cls not in cache:
+        if cls is model.ToolReturn:
+            translated = cls(message.content, message.name, message.id, message.error)
+        elif cls is model.Assistant:
+            tool_calls = [translate_tool_call(tool_call, model) for tool_call in message.tool_calls]
+
+            translated = cls(message.content, tool_calls, message.finish_reason)
+            translated.model = message.model
+        else:
+            translated = cls(message.content)
+
+        cache[cls] = translated
+
+    return cache[cls]
+
+class Router(BaseModel):
+    """
+    Sends each request to one of several configured models. The conversation is kept in the
+    common message classes and translated into a model's own classes when it's sent there.
+
+    With the "fallback" policy, models are tried in the order of `routes`, moving on to the
+    next when one fails or doesn't respond within `timeout`. With "race", the request goes to
+    every model at once and the first to respond is used. Turns listed in `cheap_turns` go to
+    `cheap_route` first, if one is configured. A streamed response is only abandoned for
+    another model before its first event, so output is never repeated.
+    """
+    provider = "router"
+    model = None
+
+    has_tools = True
+
+    policy = "fallback"
+
+    # The models requests are routed to, in order of preference, as {"provider": ..., "model": ...}
+    routes = []
+
+    # An optional small (e.g. local) model, and the turns it takes: "summary" for compaction
+    # summaries, and (opt-in) "tool_return" for the turns answering tool results
+    cheap_route = None
+    cheap_turns = ["summary"]
+
+    # Seconds to wait for a model's response, or for the first event of a streamed one
+    timeout = None
+
+    def __init__(self):
+        super().__init__()
+
+        self.members = []
+        self.cheap = None
+        self._api_key = None
+
+        # The model that served the last request
+        self.current = None
+
+    def __str__(self):
+        return self.model
+
+    def build_routes(self, create_model):
+        """Creates the routed models with `create_model(provider, model_name)`."""
+        if self.policy not in POLICIES:
+            raise ModelNotFoundException(f"Unknown routing policy '{self.policy}', expected one of: {', '.join(POLICIES)}")
+
+        if not self.routes:
+            raise ModelNotFoundException("No routes configured for the router")
+
+        self.members = [create_model(route["provider"], route["model"]) for route in self.routes]
+
+        if self.cheap_route:
+            self.cheap = create_model(self.cheap_route["provider"], self.cheap_route["model"])
+
+        self.current = self.members[0]
+
+    @property
+    def api_key(self):
+        return self._api_key
+
+    @api_key.setter
+    def api_key(self, api_key):
+        """Passes the key (e.g. from --api-key) on to the routed models that take one."""
+        self._api_key = api_key
+
+        for member in self.members + [self.cheap]:
+            if member is not None and hasattr(member, "api_key"):
+                member.api_key = api_key
+
+    @property
+    def scheduler(self):
+        """The scheduler of the model that served the last request, for its metrics."""
+        return self.current.scheduler
+
+    @property
+    def usage(self):
+        return getattr(self.current, "usage", None)
+
+    def _cheap_turn(self) -> bool:
+        return bool(
+            self.cheap and "tool_return" in self.cheap_turns
+            and self._messages and isinstance(self._messages[-1], ToolReturn)
+        )
+
+    def _candidates(self):
+        return [self.cheap] + self.members if self._cheap_turn() else self.members
+
+    def _racing(self) -> bool:
+        return self.policy == "race" and not self._cheap_turn()
+
+    def _bind(self, member):
+        member.tools = getattr(self, "tools", None)
+
+    def _prepare(self, member):
+        # The history was already compacted while the request size was checked
+        self._bind(member)
+        member.system_prompt = self.system_prompt
+        member._messages = [translate(message, member) for message in self._messages]
+
+    def _record(self, member, response):
+        """Adds the response `member` appended to its own history to the conversation."""
+        self.current = member
+
+        message = member._messages[-1]
+        common = translate(message, self)
+
+        if common is not message:
+            common._translations = {type(message): message}
+
+        self.add_message(common)
+
+        return response
+
+    def _failed(self, member, e) -> str:
+        reason = f"no response within {self.timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+        error = f"{member.provider}/{member.model}: {reason}"
+        logger.warning(f"Request to {error}")
+
+        return error
+
+    def _exhausted(self, errors):
+        return ModelReturnError("No model could respond. " + "; ".join(errors))
+
+    def generate_response(self):
+        errors = []
+
+        # Requests can't be raced without an event loop
+        for member in self._candidates():
+            self._prepare(member)
+
+            try:
+                return self._record(member, member.generate_response())
+            except Exception as e:
+                errors.append(self._failed(member, e))
+
+        raise self._exhausted(errors)
+
+    async def agenerate_response(self):
+        if self._racing():
+            member, response = await self._race(self._respond)
+
+            return self._record(member, response)
+
+        errors = []
+
+        for member in self._candidates():
+            try:
+                return self._record(member, await self._respond(member))
+            except Exception as e:
+                errors.append(self._failed(member, e))
+
+        raise self._exhausted(errors)
+
+    async def _respond(self, member):
+        self._prepare(member)
+
+        return await asyncio.wait_for(member.agenerate_response(), self.timeout)
+
+    async def _open_stream(self, member):
+        """Starts streaming from `member`; returns the stream and its first event."""
+        self._prepare(member)
+        stream = member.astream_response()
+
+        try:
+            return stream, await asyncio.wait_for(stream.__anext__(), self.timeout)
+        except BaseException:
+            await stream.aclose()
+            raise
+
+    async def _race(self, start, discard=None):
+        """
+        Runs `start(member)` for every member at once and returns the first member to succeed
+        with its result. The others are cancelled, and `discard` is awaited on results they
+        produced anyway.
+        """
+        tasks = {asyncio.ensure_future(start(member)): member for member in self.members}
+        pending = set(tasks)
+        winner = None
+        errors = []
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return tasks[task], task.result()
+
+                    errors.append(self._failed(tasks[task], task.exception()))
+        finally:
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            for task in tasks:
+                if discard and task is not winner and not task.cancelled() and task.exception() is None:
+                    await discard(task.result())
+
+        raise self._exhausted(errors)
+
+    async def astream_response(self):
+        if self._racing():
+            member, (stream, event) = await self._race(self._open_stream, discard=lambda opened: opened[0].aclose())
+        else:
+            errors = []
+
+            for member in self._candidates():
+                try:
+                    stream, event = await self._open_stream(member)
+                    break
+                except Exception as e:
+                    errors.append(self._failed(member, e))
+            else:
+                raise self._exhausted(errors)
+
+        try:
+            while True:
+                if isinstance(event, StreamEnd):
+                    self._record(member, event.response)
+
+                yield event
+
+                try:
+                    event = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+        finally:
+            await stream.aclose()
+
+    def summarize(self, messages) -> str:
+        candidates = self.members
+
+        if self.cheap and "summary" in self.cheap_turns:
+            candidates = [self.cheap] + candidates
+
+        errors = []
+
+        for member in candidates:
+            self._bind(member)
+
+            try:
+                return member.summarize(messages)
+            except Exception as e:
+                errors.append(self._failed(member, e))
+
+        raise self._exhausted(errors)
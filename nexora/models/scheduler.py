@@ -0,0 +1,182 @@
+from email.utils import parsedate_to_datetime
+
+from nexora.logger import logger
+from nexora.exceptions import ModelReturnError
+
+import threading
+import asyncio
+import random
+import time
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors and overload
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Errors without a status that are still transient, by class name so every SDK is covered
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "Timeout", "ServiceUnavailableError", "InternalServerError"}
+
+def status_code(e):
+    return getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+
+def is_retryable(e) -> bool:
+    if status_code(e) in RETRYABLE_STATUS:
+        return True
+
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(e).__mro__)
+
+def retry_after(e):
+    """Seconds to wait according to the error response's retry-after-ms or Retry-After header, if any."""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+
+        value = headers.get("retry-after")
+
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        pass
+
+    return None
+
+class TokenBucket:
+    """
+    Allows `per_minute` units (requests or tokens) a minute, refilled continuously. Callers
+    reserve what they need up front and are told how long to wait for it, so waiting can be
+    done with either time.sleep or asyncio.sleep.
+    """
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.available = per_minute
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # A request larger than the bucket still goes through, once the bucket is full
+            self.available -= min(amount, self.capacity)
+
+            return max(-self.available / self.rate, 0)
+
+class RequestScheduler:
+    """
+    Sends a provider's requests: first waiting for the provider's requests and tokens per
+    minute limits, if configured, then retrying transient failures (429s, 5xx, connection
+    errors) with jittered exponential backoff, honoring Retry-After. Time spent throttled
+    and backing off is kept in `metrics`.
+    """
+    def __init__(self, name, requests_per_minute=None, tokens_per_minute=None, max_retries=5, base_delay=1, max_delay=60):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.metrics = {
+            "requests": 0,
+            "retries": 0,
+            "throttled_seconds": 0.0,
+            "backoff_seconds": 0.0,
+        }
+
+    def _throttle(self, tokens) -> float:
+        """Reserves capacity for a request; returns how long to wait before sending it."""
+        wait = 0
+
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+
+        self.metrics["requests"] += 1
+
+        if wait:
+            self.metrics["throttled_seconds"] += wait
+            logger.debug(f"{self.name}: throttled for {wait:.1f}s by rate limits")
+
+        return wait
+
+    def _backoff(self, e, attempt) -> float:
+        """Returns how long to wait before retrying after `e`, or raises if it shouldn't be retried."""
+        if not is_retryable(e):
+            raise e
+
+        if attempt >= self.max_retries:
+            raise ModelReturnError(f"{type(e).__name__} after {attempt} retries: {e}") from e
+
+        # Full jitter keeps concurrent clients from retrying in lockstep
+        delay = retry_after(e)
+
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+        self.metrics["retries"] += 1
+        self.metrics["backoff_seconds"] += delay
+
+        logger.debug(f"{self.name}: {type(e).__name__} ({status_code(e)}), retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+
+        return delay
+
+    def call(self, func, *args, tokens=0, **kwargs):
+        time.sleep(self._throttle(tokens))
+
+        attempt = 0
+
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except ModelReturnError:
+                raise
+            except Exception as e:
+                time.sleep(self._backoff(e, attempt))
+                attempt += 1
+
+    async def acall(self, func, *args, tokens=0, **kwargs):
+        await asyncio.sleep(self._throttle(tokens))
+
+        attempt = 0
+
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except ModelReturnError:
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._backoff(e, attempt))
+                attempt += 1
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(provider, rate_limits=None, max_retries=5) -> RequestScheduler:
+    """
+    Returns the scheduler of a provider, shared by all its models so they draw on the same
+    rate limits. `rate_limits` takes `requests_per_minute` and `tokens_per_minute`.
+    """
+    rate_limits = rate_limits or {}
+    key = (provider, tuple(sorted(rate_limits.items())), max_retries)
+
+    with _schedulers_lock:
+        if key not in _schedulers:
+            _schedulers[key] = RequestScheduler(
+                name=provider,
+                requests_per_minute=rate_limits.get("requests_per_minute"),
+                tokens_per_minute=rate_limits.get("tokens_per_minute"),
+                max_retries=max_retries
+            )
+
+        return _schedulers[key]
@@ -0,0 +1,111 @@
+from nexora.messages.tool_call import ToolCall
+from nexora.types.function import Function
+
+class TextDelta:
+    """A piece of response text, as soon as the provider sends it."""
+    def __init__(self, text: str):
+        self.text = text
+
+class ToolCallReady:
+    """A tool call whose arguments have been fully received."""
+    def __init__(self, tool_call: ToolCall):
+        self.tool_call = tool_call
+
+class StreamEnd:
+    """The last event of a stream, carrying the complete response."""
+    def __init__(self, response):
+        self.response = response
+
+def build_tool_call(id, name, arguments, type="function"):
+    return ToolCall(content=Function.from_json(name, arguments or "{}"), type=type, id=id)
+
+class ToolCallAssembler:
+    """
+    Assembles OpenAI-style streamed tool call deltas (as also produced by LiteLLM). Deltas of
+    one call share an `index`, and calls arrive one after another, so a call is complete once
+    the next one starts or the stream ends.
+    """
+    def __init__(self):
+        self.calls = {}
+        self.current = None
+        self.completed = []
+
+    def feed(self, deltas):
+        """Adds a chunk's tool call deltas and returns any tool calls completed by it."""
+        ready = []
+
+        for delta in deltas or []:
+            index = delta.index if delta.index is not None else len(self.calls)
+
+            if index != self.current:
+                ready += self._complete()
+                self.current = index
+                self.calls[index] = {"id": None, "type": "function", "name": "", "arguments": ""}
+
+            call = self.calls[index]
+
+            if delta.id:
+                call["id"] = delta.id
+
+            if delta.type:
+                call["type"] = delta.type
+
+            if delta.function:
+                call["name"] += delta.function.name or ""
+                call["arguments"] += delta.function.arguments or ""
+
+        return ready
+
+    def finish(self):
+        """Returns the last tool call, which is complete once the stream ends."""
+        return self._complete()
+
+    def _complete(self):
+        if self.current is None:
+            return []
+
+        call = self.calls.pop(self.current)
+        self.current = None
+
+        tool_call = build_tool_call(call["id"], call["name"], call["arguments"], type=call["type"])
+        self.completed.append(tool_call)
+
+        return [tool_call]
+
+class ChatCompletionStream:
+    """
+    Turns the chunks of an OpenAI-style chat completion stream (as also produced by LiteLLM)
+    into stream events, collecting the response text and finish reason along the way. Used by
+    both the blocking and the async streams of a model.
+    """
+    def __init__(self):
+        self.content = None
+        self.finish_reason = None
+        self.assembler = ToolCallAssembler()
+
+    def feed(self, chunk):
+        """Returns the events of one chunk."""
+        if not chunk.choices:
+            return []
+
+        choice = chunk.choices[0]
+        events = []
+
+        if choice.delta.content:
+            self.content = (self.content or "") + choice.delta.content
+            events.append(TextDelta(choice.delta.content))
+
+        events += [ToolCallReady(tool_call) for tool_call in self.assembler.feed(choice.delta.tool_calls)]
+
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+
+        return events
+
+    def finish(self):
+        """Returns the events of the last tool call, complete once the stream has ended."""
+        return [ToolCallReady(tool_call) for tool_call in self.assembler.finish()]
+
+    @property
+    def tool_calls(self):
+        return self.assembler.completed
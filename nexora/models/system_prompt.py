@@ -10,5 +10,4 @@ Below is some up-to-date information to keep you in the loop of the current stat
 User's username: {username} 
 Current directory: {current_directory}
 Listing of directories/files: {listing}
-Current time: {time}
 """
\ No newline at end of file
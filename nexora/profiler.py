@@ -0,0 +1,85 @@
+import builtins
+import importlib
+import importlib.util
+import sys
+import time
+
+
+class ImportProfiler:
+    """
+    Records how long each module takes to import while active, similar to `python -X importtime`.
+
+    Only first-time imports are recorded; `self` time excludes the time spent importing
+    the module's own dependencies, `cumulative` includes it. Both import statements and
+    `importlib.import_module` (used to load the configured model class) are timed.
+    """
+    def __init__(self):
+        self.timings = {}
+        self._stack = []
+        self._original_import = None
+        self._original_import_module = None
+        self._started = None
+        self.total = 0.0
+
+    def start(self):
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+        builtins.__import__ = self._import
+        importlib.import_module = self._import_module
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            importlib.import_module = self._original_import_module
+            self._original_import = self._original_import_module = None
+            self.total = time.perf_counter() - self._started
+
+    def _resolve(self, name, globals, level):
+        if level == 0:
+            return name
+
+        package = (globals or {}).get('__package__') or ''
+
+        try:
+            return importlib.util.resolve_name('.' * level + name, package)
+        except (ImportError, ValueError):
+            return name
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = self._resolve(name, globals, level)
+
+        return self._timed(module_name, self._original_import, name, globals, locals, fromlist, level)
+
+    def _import_module(self, name, package=None):
+        module_name = importlib.util.resolve_name(name, package) if name.startswith('.') else name
+
+        return self._timed(module_name, self._original_import_module, name, package)
+
+    def _timed(self, module_name, do_import, *args):
+        if module_name in sys.modules or module_name in self.timings:
+            return do_import(*args)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+
+        try:
+            return do_import(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+
+            if self._stack:
+                self._stack[-1] += elapsed
+
+            self.timings[module_name] = (elapsed - children, elapsed)
+
+    def report(self, limit=25, file=None):
+        file = file or sys.stderr
+        rows = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+
+        print(f"Startup import profile ({len(self.timings)} modules, {self.total * 1000:.1f} ms total):", file=file)
+        print(f"{'self [ms]':>10} {'cumulative [ms]':>16}  module", file=file)
+
+        for module_name, (self_time, cumulative) in rows[:limit]:
+            print(f"{self_time * 1000:>10.1f} {cumulative * 1000:>16.1f}  {module_name}", file=file)
@@ -0,0 +1,91 @@
+import json
+
+from nexora.logger import logger
+from nexora.messages.system import System
+
+# Fixed cost of a message's role and framing, as counted by OpenAI's chat format
+MESSAGE_OVERHEAD = 4
+
+_encoding = None
+_schema_tokens = {}
+
+def get_encoding():
+    """
+    Returns a tiktoken encoding if tiktoken is installed (it is optional), otherwise False.
+    Token counts are then estimated at ~4 characters per token.
+    """
+    global _encoding
+
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.debug(f"tiktoken unavailable, estimating token counts: {e}")
+            _encoding = False
+
+    return _encoding
+
+def count_tokens(text) -> int:
+    if not text:
+        return 0
+
+    if not isinstance(text, str):
+        text = json.dumps(text)
+
+    encoding = get_encoding()
+
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return (len(text) + 3) // 4
+
+def message_tokens(message) -> int:
+    """
+    Token count of a message, cached on the message. BaseMessage drops the cached count
+    whenever one of the message's attributes is reassigned.
+    """
+    cached = message.__dict__.get("_token_count")
+
+    if cached is not None:
+        return cached
+
+    count = MESSAGE_OVERHEAD + count_tokens(message.content)
+
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        count += count_tokens(tool_call.content.name) + count_tokens(tool_call.content.arguments)
+
+    message._token_count = count
+
+    return count
+
+def schema_tokens(schemas) -> int:
+    # Rendered schemas are cached lists (see ToolRegistry), so count each list once
+    key = id(schemas)
+
+    if key not in _schema_tokens or _schema_tokens[key][0] is not schemas:
+        _schema_tokens[key] = (schemas, count_tokens(schemas))
+
+    return _schema_tokens[key][1]
+
+def request_breakdown(model, compact=True) -> dict:
+    """
+    Token counts of the next request `model` would send, by part. With `compact` off, the
+    history is counted as it is, without running the compactor (which may call the model).
+    """
+    history = model.messages if compact else model._messages
+    messages = [message for message in history if not isinstance(message, System)]
+    tools = getattr(model, "tools", None)
+
+    return {
+        "system": count_tokens(model.system_prompt) + MESSAGE_OVERHEAD,
+        "tools": schema_tokens(tools.__obj__) if tools else 0,
+        "messages": sum(message_tokens(message) for message in messages),
+        "message_count": len(messages),
+    }
+
+def request_tokens(model) -> int:
+    breakdown = request_breakdown(model)
+
+    return breakdown["system"] + breakdown["tools"] + breakdown["messages"]
@@ -2,77 +2,119 @@ from nexora.tools.fileio import FileIO
 from nexora.tools.http import HTTP
 from nexora.tools.shell import Shell
 from nexora.tools.image import ImageTool
+from nexora.tools.search import Search
+from nexora.tools.registry import ToolRegistry
+from nexora.tools.basetool import ToolContext
 
 class Tools:
     def __init__(self, ToolReturn):
         self.ToolReturn = ToolReturn
-        self._tools = ("Shell", "FileIO", "HTTP", "ImageTool")
-        # self._tools = [Shell, FileIO, HTTP, ImageTool]
+        self._tools = ("Shell", "FileIO", "HTTP", "ImageTool", "Search")
+        # self._tools = [Shell, FileIO, HTTP, ImageTool, Search]
+
+        # Rendered schemas for the active tool set, keyed by provider format
+        self._schemas = {}
+
+        # Resolved tool classes and the name -> bound method table, built on first use
+        self._classes = None
+        self._dispatch = None
 
     @property
     def tools(self):
-        tools = []
-
-        for tool in self._tools:
-            tools.append(globals()[tool])
+        if self._classes is None:
+            self._classes = [globals()[tool] if isinstance(tool, str) else tool for tool in self._tools]
 
-        return tools
+        return self._classes
     
     @tools.setter
     def tools(self, tools):
         self._tools = tools
+        self._schemas = {}
+        self._classes = None
+        self._dispatch = None
+
+    @property
+    def dispatch(self):
+        """Maps full function names (e.g. `fileio_read`) to methods bound to one shared instance per tool."""
+        if self._dispatch is None:
+            dispatch = {}
+
+            for Tool in self.tools:
+                tool = Tool()
+
+                for schema in ToolRegistry.compile(Tool):
+                    name = schema["function"]["name"]
+                    dispatch[name] = (tool, getattr(tool, name[len(Tool.name) + 1:]))
+
+            self._dispatch = dispatch
+
+        return self._dispatch
+
+    def is_readonly(self, name, kwargs):
+        """Whether a call is marked side-effect free (see `basetool.readonly`) and may run concurrently."""
+        if name not in self.dispatch:
+            return False
+
+        marker = getattr(self.dispatch[name][1], "readonly", False)
+
+        if callable(marker):
+            return bool(marker(kwargs))
+
+        return bool(marker)
 
     def call(self, name, call_id, app, kwargs):
         try:
-            tool_name, function_name = name.split("_")
-        except ValueError:
-            raise ValueError(f"Unable to unpack method {name}")
-
-        for tool in self.tools:
-            if tool.name == tool_name and hasattr(tool, function_name):
-                # Create tool context
-                tool_cxt = tool()
-
-                tool_cxt.app = app
-
-                # Call the function and return the result
-                try:
-                    kwargs_f = ("%s=%r" % (k, v) for k, v in kwargs.items())
-                    kwargs_f = ", ".join(kwargs_f)
-
-                    print(f"\033[92m* {name}({kwargs_f})\033[0m")
-                    
-                    content = getattr(tool_cxt, function_name)(**kwargs)
-
-                    tool_return = self.ToolReturn(
-                        content=content,
-                        id=call_id,
-                        name=name,
-                    )
-                except Exception as e:
-                    # Log and return error message to the LLM
-                    print(f"func returned error: {e}")
-                    err = f"Tool call failed with the following error: {e}"
-                    
-                    tool_return = self.ToolReturn(
-                        content=err,
-                        id=call_id,
-                        name=name,
-                        error=True
-                    )
-                
-                return tool_return
-
-        raise NotImplementedError(f"Couldn't find the method {name}")
+            tool, method = self.dispatch[name]
+        except KeyError:
+            raise NotImplementedError(f"Couldn't find the method {name}")
+
+        tool.context = ToolContext(app=app, call_id=call_id, name=name)
+
+        # Call the function and return the result
+        try:
+            kwargs_f = ("%s=%r" % (k, v) for k, v in kwargs.items())
+            kwargs_f = ", ".join(kwargs_f)
+
+            print(f"\033[92m* {name}({kwargs_f})\033[0m")
+            
+            content = method(**kwargs)
+
+            tool_return = self.ToolReturn(
+                content=content,
+                id=call_id,
+                name=name,
+            )
+        except Exception as e:
+            # Log and return error message to the LLM
+            print(f"func returned error: {e}")
+            err = f"Tool call failed with the following error: {e}"
+            
+            tool_return = self.ToolReturn(
+                content=err,
+                id=call_id,
+                name=name,
+                error=True
+            )
+        finally:
+            tool.context = None
+        
+        return tool_return
     
+    def render(self, format="openai"):
+        """Returns the schemas of every active tool, in the given provider's format."""
+        if format not in self._schemas:
+            schemas = []
+
+            for tool in self.tools:
+                schemas += ToolRegistry.render(tool, format)
+
+            self._schemas[format] = schemas
+
+        return self._schemas[format]
+
     @property
     def __obj__(self):
-        l = []
-        for tool in self.tools:
-            tool = tool()
-            l += tool.__func__
-
-        return l
+        return self.render("openai")
 
     @property
     def list_methods(self):
@@ -1,4 +1,4 @@
-from docstring_parser import parse
+from .registry import ToolRegistry
 
 from prompt_toolkit import print_formatted_text, prompt
 from prompt_toolkit.formatted_text import FormattedText
@@ -8,6 +8,7 @@ from prompt_toolkit.key_binding import KeyBindings
 from uuid import uuid4
 
 import os
+import threading
 
 # Define custom styles for the permission request and key bindings
 style = Style.from_dict({
@@ -35,71 +36,47 @@ def preview(event):
 def exit_app(event):
     event.app.exit()
 
+def readonly(func=None, when=None):
+    """
+    Marks a tool method as free of side effects, allowing calls to it to run concurrently
+    with other read-only calls. `when` optionally decides per call, given the call's kwargs.
+    """
+    def decorate(func):
+        func.readonly = when or True
+        return func
+
+    return decorate(func) if func else decorate
+
+class ToolContext:
+    """Per-call state handed to a tool: the running app and the call being served."""
+    def __init__(self, app, call_id, name):
+        self.app = app
+        self.call_id = call_id
+        self.name = name
+
 class BaseTool:
     name = "basetool"
 
+    def __init__(self):
+        # Tool instances are reused across calls, so the call context is kept per thread
+        self._local = threading.local()
+
+    @property
+    def context(self):
+        return getattr(self._local, "context", None)
+
+    @context.setter
+    def context(self, context):
+        self._local.context = context
+
+    @property
+    def app(self):
+        return self.context.app if self.context else None
+
     @property
     def __func__(self):
         """Converts the BaseTool system to the OpenAI-friendly 'functions' methodology."""
-        func = []
-
-        for attr in dir(self):
-            if attr.startswith("__"):
-                continue
-
-            method = getattr(self, attr)
-
-            if not callable(method) or not method.__doc__:
-                continue
-
-            docstring = parse(method.__doc__)
-
-            if not docstring.short_description.startswith("openai.function: "):
-                continue
-
-            properties = {}
-
-            for param in docstring.params:
-                if param.type_name == "int":
-                    type_name = "number"
-                elif param.type_name == "str":
-                    type_name = "string"
-                elif param.type_name == "bool":
-                    type_name = "boolean"
-                elif param.type_name == "list":
-                    type_name = "array"
-
-                properties[param.arg_name] = {
-                    "type": type_name,
-                    "description": param.description
-                }
-
-                if type_name == "array":
-                    properties[param.arg_name]["items"] = {
-                        "type": "string"
-                    }
-
-            try:
-                required = docstring.long_description.split(",")
-            except AttributeError:
-                required = []
-
-            function = {
-                "name": f"{self.name}_{attr}",
-                "description": docstring.short_description[17:],
-                "parameters": {
-                    "type": "object",
-                    "properties": properties,
-                    "required": required
-                }
-            }
-
-            func.append({
-                "type": "function",
-                "function": function
-            })
-
-        return func
+        return ToolRegistry.compile(type(self))
 
     def safe(self, reason, preview=None):
         if os.getenv('ALWAYS_GRANT_PERMISSION', '0') == '1':
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from nexora.logger import logger
+
+class ToolBatch:
+    """
+    The tool calls of one model turn, which may be submitted while the response is still
+    streaming. Read-only calls start right away on the pool; once a call that isn't read-only
+    is submitted, it and every call after it are held until `wait`, where they run in order.
+    """
+    def __init__(self, executor):
+        self.executor = executor
+        self.results = []
+        self.pending = []
+        self.deferred = []
+
+    def submit(self, name, call_id, kwargs):
+        index = len(self.results)
+        self.results.append(None)
+
+        if self.deferred or not self.executor.tools.is_readonly(name, kwargs):
+            self.deferred.append((index, name, call_id, kwargs))
+        else:
+            self.pending.append((index, self.executor.submit(name, call_id, kwargs)))
+
+    def fail(self, name, call_id, error):
+        """Records an error result for a call that can't be run, e.g. one with malformed arguments."""
+        self.results.append(self.executor.tools.ToolReturn(content=error, id=call_id, name=name, error=True))
+
+    def wait(self):
+        """Runs any held calls and returns all ToolReturns, in the order the calls were submitted."""
+        for index, name, call_id, kwargs in self.deferred:
+            if self.executor.tools.is_readonly(name, kwargs):
+                self.pending.append((index, self.executor.submit(name, call_id, kwargs)))
+            else:
+                self._drain()
+
+                self.results[index] = self.executor.tools.call(name=name, call_id=call_id, app=self.executor.app, kwargs=kwargs)
+
+        self.deferred = []
+        self._drain()
+
+        return self.results
+
+    def _drain(self):
+        for index, future in self.pending:
+            self.results[index] = future.result()
+
+        self.pending = []
+
+class ToolExecutor:
+    """
+    Runs the tool calls of one model turn. Read-only calls run concurrently on a thread pool;
+    any other call (which may need a permission prompt) runs on the calling thread once the
+    read-only calls queued before it have finished, so calls still observe each other's effects
+    in order. Results are returned in the original call order.
+    """
+    def __init__(self, tools, app, max_workers=8):
+        self.tools = tools
+        self.app = app
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nexora-tool")
+
+    def batch(self):
+        return ToolBatch(self)
+
+    def submit(self, name, call_id, kwargs):
+        logger.debug(f"Running {name} ({call_id}) concurrently")
+
+        return self.pool.submit(self.tools.call, name=name, call_id=call_id, app=self.app, kwargs=kwargs)
+
+    def run(self, calls):
+        """
+        Executes `calls`, a list of (name, call_id, kwargs) tuples, and returns their ToolReturns.
+        """
+        batch = self.batch()
+
+        for name, call_id, kwargs in calls:
+            batch.submit(name, call_id, kwargs)
+
+        return batch.wait()
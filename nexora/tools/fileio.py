@@ -1,10 +1,57 @@
-from .basetool import BaseTool
+from .basetool import BaseTool, readonly
+from . import lineindex, patch
+from .ignore import IgnoreRules, walk_files
 import os
-import mimetypes
+import glob
+import itertools
+import mmap
+import shutil
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Maximum number of characters returned by a single read
+READ_LIMIT = 50000
+
+# Leading bytes checked for NUL bytes to tell binary files apart
+SNIFF_BYTES = 8192
+
+# Threads reading files in readwalk and read_many
+READ_WORKERS = 8
+
+# Threads moving or deleting files in the batch operations
+BATCH_WORKERS = 8
+
+# Paths named in a batch permission prompt; the preview lists all of them
+PROMPT_PATHS = 20
+
+@contextmanager
+def atomic_write(path, mode="wb", **kwargs):
+    """
+    Opens a temporary file next to `path`, and renames it over `path` once the block completes,
+    so `path` is never left half-written. The temporary name is unique per process and thread,
+    an existing file's permissions are kept, and the temporary file is removed on failure.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(temp_path, mode, **kwargs) as f:
+            yield f
+
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
 class FileIO(BaseTool):
     name = "fileio"
 
+    @readonly
     def list(self, path):
         """
         openai.function: This lists the contents of a directory for a given path. You MUST specify a path, but you can use relative path names; for example, `.` will list the current directory, as seen in the primary system prompt. 
@@ -30,22 +77,169 @@ class FileIO(BaseTool):
 
         return dir
     
-    def read(self, path, line_numbers=False):
+    @readonly
+    def read(self, path, line_numbers=False, offset=None, limit=None, unit="lines"):
         """
-        openai.function: Read the contents of a file. If you are unsure of what names exist, use fileio_list. You MUST specify the `path` of the file to read. Output is NOT shown to the user; only you see this! 
+        openai.function: Read the contents of a file. If you are unsure of what names exist, use fileio_list. You MUST specify the `path` of the file to read. Output is NOT shown to the user; only you see this! Large files are returned in pages along with their total size and line count; use `offset` and `limit` to read further pages.
 
         path
 
         :param str path: The path of the file to read.
         :param bool line_numbers: Whether or not to read with line numbers activated. This is useful IF you are going to use the fileio_edit function to modify/patch a part of the file. If you use fileio_write, NEVER bake the line numbers into the file itself, unless instructed explicitly to do so.
+        :param int offset: Where to start reading: the 1-based line number if `unit` is "lines", or the 0-based byte offset if `unit` is "bytes". Defaults to the start of the file.
+        :param int limit: The maximum number of lines or bytes to read. Output is capped regardless.
+        :param str unit: Either "lines" (default) or "bytes"; the unit of `offset` and `limit`.
         """
-        
-        with open(path, "r") as f:
-            if line_numbers:
-                return '\n'.join([f'{i+1} | {line}' for i, line in enumerate(f.read().split('\n'))])
+        size = os.path.getsize(path)
+
+        # Small files read whole keep the plain output
+        if offset is None and limit is None and size <= READ_LIMIT:
+            with open(path, "r") as f:
+                if line_numbers:
+                    return '\n'.join([f'{i+1} | {line}' for i, line in enumerate(f.read().split('\n'))])
+                else:
+                    return f.read()
+
+        # Schema numbers may arrive as floats
+        offset = int(offset) if offset is not None else None
+        limit = int(limit) if limit is not None else None
+
+        if unit == "bytes":
+            if offset is not None and offset < 0:
+                raise ValueError(f"Invalid offset {offset}; byte offsets start at 0")
+
+            return self._read_bytes(path, size, offset or 0, limit)
+        elif unit == "lines":
+            if offset is not None and offset < 1:
+                raise ValueError(f"Invalid offset {offset}; line numbers start at 1")
+
+            return self._read_lines(path, size, offset or 1, limit, line_numbers)
+        else:
+            raise ValueError(f"Invalid unit '{unit}', expected 'lines' or 'bytes'")
+
+    @readonly
+    def read_many(self, paths, max_bytes=200000, max_file_bytes=50000):
+        """
+        openai.function: Read several files in one call, instead of calling fileio_read for each. Paths may be globs (e.g. "src/**/*.py"). Binary and unreadable files are reported rather than read. Output is capped like fileio_readwalk.
+
+        paths
+
+        :param list paths: The paths or glob patterns of the files to read.
+        :param int max_bytes: Maximum total characters of file content to return, default is 200000.
+        :param int max_file_bytes: Maximum characters returned per file, default is 50000. Longer files are cut off.
+        """
+        max_bytes, max_file_bytes = int(max_bytes), int(max_file_bytes)
+
+        files, unmatched = self._expand(paths)
+        output = [f'<error path="{pattern}">No files match</error>' for pattern in unmatched]
+        total = 0
+
+        for file_path, content, size, read in self._read_text_files((path for path in files if not os.path.isdir(path)), max_file_bytes):
+            if content is None:
+                output.append(f'<error path="{file_path}">Binary or unreadable file</error>')
+                continue
+
+            if total + len(content) > max_bytes:
+                output.append(f'<truncated reason="max_bytes reached">Stopped before {file_path}; remaining files were not read.</truncated>')
+                break
+
+            total += len(content)
+
+            truncated = f' truncated="{size - read} bytes"' if size > read else ''
+            output.append(f'<content path="{file_path}"{truncated}>{content}</content>')
+
+        return '\n'.join(output)
+
+    def _read_bytes(self, path, size, offset, limit):
+        length = min(limit if limit is not None else READ_LIMIT, READ_LIMIT, max(size - offset, 0))
+
+        with open(path, "rb") as f:
+            if length > 0:
+                # mmap gives random access into the file without reading up to the offset
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    data = mm[offset:offset + length]
             else:
-                return f.read()
-        
+                data = b""
+
+        return {
+            "path": path,
+            "size": size,
+            "offset": offset,
+            "bytes_read": len(data),
+            "next_offset": offset + len(data) if offset + len(data) < size else None,
+            "content": data.decode("utf-8", errors="replace"),
+        }
+
+    def _iter_lines(self, path, start, index):
+        """
+        Yields (line number, byte offset, line) from the 1-based line `start` on, seeking straight
+        to it. Lines are bytes, cut off after READ_LIMIT bytes so a huge line is never read whole.
+        """
+        with open(path, "rb") as f:
+            f.seek(index.offset(start))
+
+            for number in itertools.count(start):
+                offset = f.tell()
+                line = f.readline(READ_LIMIT + 1)
+
+                if not line:
+                    return
+
+                # Skip the rest of a line that was cut off
+                rest = line
+
+                while len(rest) > READ_LIMIT and not rest.endswith(b"\n"):
+                    rest = f.readline(READ_LIMIT + 1)
+
+                yield number, offset, line
+
+    def _read_lines(self, path, size, start, limit, line_numbers):
+        lines = []
+        length = 0
+        end = start - 1
+        truncated = False
+        note = None
+
+        index = lineindex.get_index(path)
+
+        for number, offset, data in self._iter_lines(path, start, index):
+            if limit is not None and number >= start + limit:
+                break
+
+            line = data.decode("utf-8", errors="replace")
+
+            if line_numbers:
+                line = f"{number} | {line}"
+
+            if length + len(line) > READ_LIMIT:
+                truncated = True
+
+                # A first line too long for a page is cut off, rather than returning nothing
+                if not lines:
+                    lines.append(line[:READ_LIMIT])
+                    end = number
+                    note = f"Line {number} is too long to return whole; read it with unit=\"bytes\" from offset {offset}"
+
+                break
+
+            lines.append(line)
+            length += len(line)
+            end = number
+
+        total_lines = index.line_count
+
+        return {
+            "path": path,
+            "size": size,
+            "total_lines": total_lines,
+            "start_line": start,
+            "end_line": end,
+            "next_offset": end + 1 if end < total_lines else None,
+            "truncated": truncated,
+            **({"note": note} if note else {}),
+            "content": "".join(lines),
+        }
+
     def create(self, path):
         """
         openai.function: Create a new, empty file at the specified path. If your intention is to write data to the file, you SHOULD NOT USE THIS and instead, just use fileio_write. 
@@ -80,6 +274,8 @@ class FileIO(BaseTool):
         with open(path, "w") as f:
             f.write(content)
 
+        lineindex.invalidate(path)
+
         return "Successfully wrote {path}"
 
     def append(self, path, content):
@@ -102,6 +298,66 @@ class FileIO(BaseTool):
 
         return "Successfully appended to {path}"
 
+    def edit(self, path, start_line=None, end_line=None, content=None, expected=None, diff=None):
+        """
+        openai.function: Edits part of an existing file instead of rewriting all of it with fileio_write; prefer this for any change to an existing file. Either replace the lines `start_line` to `end_line` with `content`, or apply a unified `diff`. Context and removed lines of the diff, or `expected` for a line range, are checked against the file first, and nothing is written if they don't match. Read the file with line_numbers first. Returns a compact diff of the change.
+
+        path
+
+        :param str path: The path of the file to edit.
+        :param int start_line: First line (1-based) to replace. To insert without replacing, set end_line to start_line - 1.
+        :param int end_line: Last line (inclusive) to replace, defaults to start_line.
+        :param str content: The text replacing the lines; empty to delete them.
+        :param str expected: Optionally, the current text of the lines being replaced, to make sure the right lines are edited.
+        :param str diff: A unified diff (with `@@ -start,count +start,count @@` hunk headers) to apply instead of a line range.
+        """
+        with open(path, "r", newline="") as f:
+            before = f.read().splitlines(keepends=True)
+
+        newline = "\r\n" if before and before[0].endswith("\r\n") else "\n"
+
+        if diff:
+            after = patch.apply_hunks(before, patch.parse_hunks(diff), newline=newline)
+        elif start_line is not None:
+            after = self._replace_lines(before, int(start_line), int(end_line if end_line is not None else start_line), content or "", expected, newline)
+        else:
+            raise ValueError("Specify either `diff`, or `start_line` and `content`")
+
+        if after == before:
+            return f"No changes to {path}"
+
+        changes = patch.compact_diff(path, before, after)
+
+        self.safe(
+            reason=f"Edit file {path}",
+            preview=changes
+        )
+
+        with atomic_write(path, "w", newline="") as f:
+            f.write("".join(after))
+
+        lineindex.invalidate(path)
+
+        return f"Successfully edited {path}\n{changes}"
+
+    def _replace_lines(self, lines, start, end, content, expected, newline):
+        if start < 1 or start > len(lines) + 1 or end < start - 1 or end > len(lines):
+            raise ValueError(f"Invalid line range {start}-{end}; the file has {len(lines)} lines")
+
+        current = "".join(lines[start - 1:end])
+
+        if expected is not None and expected.rstrip("\r\n").splitlines() != current.rstrip("\r\n").splitlines():
+            raise ValueError(f"Lines {start}-{end} don't match `expected`; they currently are:\n{current}")
+
+        replacement = [line.rstrip("\r\n") + newline for line in content.splitlines()]
+        result = patch.end_lines(lines[:start - 1] + replacement + lines[end:], newline)
+
+        # Keep the file's last line without a newline if it had none, unless `content` replacing it ends with one
+        if result and lines and not lines[-1].endswith("\n") and not (replacement and end == len(lines) and content.endswith("\n")):
+            result[-1] = result[-1].rstrip("\r\n")
+
+        return result
+
     def delete(self, path):
         """openai.function: Delete a file at the specified path.
 
@@ -123,6 +379,33 @@ class FileIO(BaseTool):
         except Exception as e:
             print(f'Error deleting {path}: {e}')
 
+    def delete_many(self, paths):
+        """openai.function: Delete several files (or empty directories) in one call, with a single permission prompt. Paths may be globs (e.g. "build/*.o"). Returns the outcome for each path.
+
+        paths
+
+        :param list paths: The paths or glob patterns to delete.
+        """
+        targets, unmatched = self._expand(paths)
+
+        if targets:
+            self._safe_batch("Delete", targets)
+
+        def delete(path):
+            if os.path.isdir(path) and not os.path.islink(path):
+                os.rmdir(path)
+            else:
+                os.remove(path)
+
+            return "deleted"
+
+        # Directories are removed once the files in them are, deepest first
+        directories = {path for path in targets if os.path.isdir(path) and not os.path.islink(path)}
+        files = [path for path in targets if path not in directories]
+        directories = sorted(directories, key=lambda path: os.path.normpath(path).count(os.sep), reverse=True)
+
+        return self._run_batch(delete, files, unmatched, then=directories)
+
     def mkdir(self, path):
         """
         openai.function: Create a new directory at the specified path.
@@ -169,6 +452,96 @@ class FileIO(BaseTool):
 
         return f"Successfully moved {source} to {destination}"
 
+    def move_many(self, sources, destination):
+        """
+        openai.function: Move several files/directories into a destination directory in one call, with a single permission prompt. Sources may be globs (e.g. "*.log"). The destination is created if missing, and existing files there are never overwritten. Returns the outcome for each source.
+
+        sources,destination
+
+        :param list sources: The paths or glob patterns to move.
+        :param str destination: The directory to move them into.
+        """
+        targets, unmatched = self._expand(sources)
+
+        if targets:
+            self._safe_batch(f"Move to {destination}", targets)
+            os.makedirs(destination, exist_ok=True)
+
+        # Moves run concurrently, so sources sharing a name are settled up front: the first
+        # one takes the target, and the others would overwrite it
+        claimed = {}
+
+        for source in targets:
+            claimed.setdefault(os.path.basename(os.path.normpath(source)), source)
+
+        def move(source):
+            name = os.path.basename(os.path.normpath(source))
+            target = os.path.join(destination, name)
+
+            if claimed[name] != source:
+                raise FileExistsError(f"{target} is also the target of {claimed[name]}")
+
+            if os.path.lexists(target):
+                raise FileExistsError(f"{target} already exists")
+
+            shutil.move(source, target)
+
+            return f"moved to {target}"
+
+        return self._run_batch(move, targets, unmatched)
+
+    def _expand(self, patterns):
+        """Expands globs in `patterns`; returns the unique paths in order, and the patterns that matched nothing."""
+        if isinstance(patterns, str):
+            patterns = [patterns]
+
+        paths = {}
+        unmatched = []
+
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+
+            if not matches:
+                unmatched.append(pattern)
+
+            paths.update(dict.fromkeys(matches))
+
+        return list(paths), unmatched
+
+    def _safe_batch(self, action, paths):
+        """Asks for permission once for a whole batch, listing every affected path in the preview."""
+        listed = ", ".join(paths[:PROMPT_PATHS])
+        more = f" and {len(paths) - PROMPT_PATHS} more" if len(paths) > PROMPT_PATHS else ""
+
+        self.safe(
+            reason=f"{action}: {len(paths)} paths ({listed}{more})",
+            preview="\n".join(paths)
+        )
+
+    def _run_batch(self, operation, paths, unmatched, then=()):
+        """
+        Runs `operation` over `paths` on a thread pool, and then over `then` one at a time in
+        order, collecting a result or error per path.
+        """
+        def run(path):
+            try:
+                return {"path": path, "result": operation(path)}
+            except Exception as e:
+                return {"path": path, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+            results = list(pool.map(run, paths))
+
+        results += [run(path) for path in then]
+        results += [{"path": pattern, "error": "No files match"} for pattern in unmatched]
+        failed = sum("error" in result for result in results)
+
+        return {
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
+
     def cd(self, path):
         """openai.function: Change the current working directory of the program.
 
@@ -180,58 +553,159 @@ class FileIO(BaseTool):
         os.chdir(path)
         return f"Changed working directory to {path}"
 
-    def walk(self, directory):
+    @readonly
+    def walk(self, directory, max_depth=10, max_entries=2000, ignore=None):
         """
-        openai.function: Walk the directory tree and return a formatted filesystem tree. You must specify the directory to begin walking.
+        openai.function: Walk the directory tree and return a formatted filesystem tree. You must specify the directory to begin walking. Paths ignored by .gitignore files are left out, and the output notes where it was cut short by `max_depth` or `max_entries`.
 
         directory
 
         :param str directory: The directory to walk.
+        :param int max_depth: How many directory levels deep to list, default is 10.
+        :param int max_entries: Maximum number of files and directories to list, default is 2000.
+        :param list ignore: Additional .gitignore-style patterns to leave out, e.g. ["node_modules/", "*.pyc"].
         """
+        max_depth, max_entries = int(max_depth), int(max_entries)
+
+        if isinstance(ignore, str):
+            ignore = [ignore]
+
+        rules = IgnoreRules(directory, patterns=ignore)
+        lines = [f'+ {directory}']
+        entries = 0
+        unexpanded = 0
+        truncated = False
+
+        # Depth-first; items are either a directory to list or lines ready to output
+        stack = [('dir', directory, 1)]
+
+        while stack:
+            item = stack.pop()
+
+            if item[0] == 'lines':
+                lines += item[1]
+                continue
+
+            _, path, depth = item
+            indent = '    ' * depth
+
+            # Directories are still opened after reaching max_entries, to find out if anything is left out
+            if truncated:
+                continue
+
+            try:
+                with os.scandir(path) as it:
+                    children = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                lines.append(f'{indent}! {e.strerror}')
+                continue
+
+            dirs = []
+            files = []
+
+            for entry in children:
+                is_dir = entry.is_dir(follow_symlinks=False)
+
+                if rules.is_ignored(entry.path, is_dir=is_dir):
+                    continue
+
+                if entries >= max_entries:
+                    truncated = True
+                    break
+
+                entries += 1
+                (dirs if is_dir else files).append(entry)
+
+            # Each directory is followed by its own contents, then come the files
+            stack.append(('lines', [f'{indent}* {entry.name}' for entry in files]))
+
+            for entry in reversed(dirs):
+                if depth < max_depth:
+                    stack.append(('dir', entry.path, depth + 1))
+                    stack.append(('lines', [f'{indent}- {entry.name}/']))
+                else:
+                    unexpanded += 1
+                    stack.append(('lines', [f'{indent}- {entry.name}/ ...']))
+
+        if truncated:
+            lines.append(f'[Truncated after {max_entries} entries; walk a subdirectory or raise max_entries to see more]')
 
-        def tree_structure(start_path, level=0):
-            tree_str = ''
-            for root, dirs, files in os.walk(start_path):
-                indent = '    ' * level
-                tree_str += f'{indent}+ {root}]\n'
-                for dir in sorted(dirs):
-                    tree_str += f'{indent}    - {dir}\n'
-                for file in sorted(files):
-                    tree_str += f'{indent}    * {file}\n'
-                level += 1
-            return tree_str
+        if unexpanded:
+            lines.append(f'[{unexpanded} directories at max_depth {max_depth} were not expanded]')
 
-        return tree_structure(directory)
+        return '\n'.join(lines)
 
-    def readwalk(self, directory):
+    @readonly
+    def readwalk(self, directory, max_bytes=200000, max_file_bytes=50000):
         """
-        WALKS AND READS through the directories and files starting from 'directory'. Outputs the contents of all text files, excluding binary and hidden files. You must specify a directory to walk.
+        openai.function: WALKS AND READS through the directories and files starting from 'directory'. Outputs the contents of all text files, excluding binary, hidden and .gitignore'd files, in a deterministic order. Output is capped; when the cap is reached, the file it stopped at is reported. You must specify a directory to walk.
 
         directory
 
         :param str directory: The root directory to start walking through.
+        :param int max_bytes: Maximum total characters of file content to return, default is 200000.
+        :param int max_file_bytes: Maximum characters returned per file, default is 50000. Longer files are cut off.
         """
-        def is_text_file(filepath):
-            type, _ = mimetypes.guess_type(filepath)
-            return type is None or type.startswith('text')
-        
-        def is_hidden(filepath):
-            return os.path.basename(filepath).startswith('.')
+        max_bytes, max_file_bytes = int(max_bytes), int(max_file_bytes)
 
         output = []
+        total = 0
+
+        for file_path, content, size, read in self._read_text_files(walk_files(directory), max_file_bytes):
+            if content is None:
+                continue
+
+            if total + len(content) > max_bytes:
+                output.append(f'<truncated reason="max_bytes reached">Stopped before {file_path}; remaining files were not read.</truncated>')
+                break
 
-        for root, dirs, files in os.walk(directory):
-            dirs[:] = [d for d in dirs if not is_hidden(os.path.join(root, d))]  # Exclude hidden directories
-            for file in files:
-                if not is_hidden(file):
-                    file_path = os.path.join(root, file)
-                    if is_text_file(file_path):
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                            output.append(f'<content path="{file_path}">{content}</content>')
-                        except UnicodeDecodeError:
-                            # This handles the rare case where mimetypes considers a binary file as text.
-                            pass
+            total += len(content)
+
+            truncated = f' truncated="{size - read} bytes"' if size > read else ''
+            output.append(f'<content path="{file_path}"{truncated}>{content}</content>')
 
         return '\n'.join(output)
+
+    def _read_text_file(self, file_path, max_file_bytes):
+        """
+        Returns (path, content, size, bytes read), with content None for binary or unreadable
+        files. Bytes read excludes a multi-byte character cut off by the limit.
+        """
+        try:
+            size = os.path.getsize(file_path)
+
+            with open(file_path, 'rb') as f:
+                data = f.read(max_file_bytes)
+        except OSError:
+            return file_path, None, 0, 0
+
+        # Sniff the start of the file instead of guessing from its extension
+        if b'\0' in data[:SNIFF_BYTES]:
+            return file_path, None, size, 0
+
+        try:
+            content = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            # Only tolerate a multi-byte character cut off by the read limit
+            if e.start < len(data) - 3:
+                return file_path, None, size, 0
+
+            data = data[:e.start]
+            content = data.decode('utf-8')
+
+        return file_path, content, size, len(data)
+
+    def _read_text_files(self, paths, max_file_bytes):
+        """Reads files on a thread pool, yielding results in the order of `paths` as they complete."""
+        window = deque()
+
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+            for file_path in paths:
+                window.append(pool.submit(self._read_text_file, file_path, max_file_bytes))
+
+                # Bound the number of reads in flight so large trees aren't read ahead entirely
+                if len(window) >= READ_WORKERS * 4:
+                    yield window.popleft().result()
+
+            while window:
+                yield window.popleft().result()
@@ -0,0 +1,45 @@
+from html.parser import HTMLParser
+
+import re
+
+# Elements whose contents are never readable text
+SKIPPED = {"script", "style", "noscript", "template", "svg"}
+
+# Elements that start a new line
+BLOCKS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "table", "section", "article", "header", "footer",
+    "nav", "aside", "main", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "hr", "title",
+    "dt", "dd", "form", "figure", "figcaption",
+}
+
+class TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED:
+            self.skipping += 1
+        elif tag in BLOCKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED:
+            self.skipping = max(self.skipping - 1, 0)
+        elif tag in BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+def html_to_text(html: str) -> str:
+    """Reduces an HTML document to its readable text, one block element per line."""
+    parser = TextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parser.parts).split("\n"))
+
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
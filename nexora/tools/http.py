@@ -1,27 +1,158 @@
-from .basetool import BaseTool
+from .basetool import BaseTool, readonly
+from .htmltext import html_to_text
+from .httpcache import HTTPCache
+from .fileio import atomic_write
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+
+from nexora.config import Config
+
+import threading
 import requests
+import os
+
+# Bytes read from a response at a time
+CHUNK_SIZE = 65536
+
+# One pooled session and one response cache per app, so connections are kept alive
+# across calls and tools
+_sessions = {}
+_caches = {}
+_sessions_lock = threading.Lock()
+
+def get_session(app, pool_size) -> requests.Session:
+    with _sessions_lock:
+        if app not in _sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+            _sessions[app] = session
+
+        return _sessions[app]
+
+def get_cache(app, max_bytes) -> HTTPCache:
+    with _sessions_lock:
+        if app not in _caches:
+            _caches[app] = HTTPCache(max_bytes=max_bytes)
+
+        return _caches[app]
+
+def is_readonly(kwargs):
+    return kwargs.get("method", "").upper() in ("GET", "HEAD", "OPTIONS") and not kwargs.get("save_to")
 
 class HTTP(BaseTool):
     name = "http"
 
-    def request(self, method, url, data=None):
-        """openai.function: Allows making arbitrary HTTP requests.
+    def setting(self, key):
+        """Reads `http.<key>` from the app's config, falling back to the defaults outside of an app."""
+        if self.app:
+            return self.app.config.get(f"http.{key}")
+
+        return Config.defaults["http"][key]
+
+    @readonly(when=is_readonly)
+    def request(self, method, url, data=None, as_text=False, save_to=None):
+        """openai.function: Allows making arbitrary HTTP requests. Response bodies are cut off after a size limit; use `save_to` to download large or binary content to a file instead, and `as_text` to reduce an HTML page to its readable text.
 
         method,url,data
 
         :param str method: The HTTP method to use (e.g., GET, POST, PUT).
         :param str url: The URL to make the request to.
         :param str data: Optional data to be sent with the request, if applicable.
+        :param bool as_text: Reduce an HTML response body to its readable text.
+        :param str save_to: Write the response body to this file path instead of returning it.
         """
+        if save_to:
+            self.safe(f"Download {url} to {save_to}")
+
+        session = get_session(self.app, self.setting("pool_size"))
+        timeout = (self.setting("connect_timeout"), self.setting("read_timeout"))
+
+        # Only plain GETs are cached, and downloads go straight to disk
+        cache = None
+        entry = None
+
+        if method.upper() == "GET" and not data and not save_to and self.setting("cache"):
+            cache = get_cache(self.app, self.setting("cache_max_bytes"))
+            entry = cache.get(url)
+
+            if entry and entry.fresh:
+                cache.record("hits", "hit", url)
+
+                return self._result(entry.status_code, entry.headers, entry.body, as_text)
+
         try:
-            response = requests.request(method.upper(), url, data=data)
-
-            result = {
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "body": response.text
-            }
-            
-            return result
+            headers = entry.validators if entry else {}
+
+            with session.request(method.upper(), url, data=data, headers=headers, timeout=timeout, stream=True) as response:
+                if entry and response.status_code == 304:
+                    cache.refresh(entry, response.headers)
+                    cache.record("revalidations", "revalidated", url)
+
+                    return self._result(entry.status_code, entry.headers, entry.body, as_text)
+
+                if save_to:
+                    result = {
+                        "status_code": response.status_code,
+                        "headers": dict(response.headers),
+                    }
+                    result.update(self._download(response, save_to))
+
+                    return result
+
+                body, truncated = self._read_body(response)
+
+                if cache:
+                    cache.record("misses", "miss", url)
+
+                    if not truncated:
+                        cache.store(url, response.status_code, response.headers, body)
+
+            return self._result(response.status_code, response.headers, body, as_text, truncated)
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
+
+    def _read_body(self, response):
+        """Reads the body up to the configured limit; returns it and whether it was cut off."""
+        limit = self.setting("max_response_bytes")
+        body = bytearray()
+
+        # Stop reading once over the limit rather than pulling the whole body into memory
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body += chunk
+
+            if len(body) > limit:
+                del body[limit:]
+                return bytes(body), True
+
+        return bytes(body), False
+
+    def _result(self, status_code, headers, body, as_text, truncated=False):
+        text = body.decode(get_encoding_from_headers(headers) or "utf-8", errors="replace")
+
+        if as_text and "html" in headers.get("Content-Type", ""):
+            text = html_to_text(text)
+
+        result = {
+            "status_code": status_code,
+            "headers": dict(headers),
+            "body": text
+        }
+
+        if truncated:
+            result["truncated"] = f"Body cut off after {self.setting('max_response_bytes')} bytes; use save_to to download all of it"
+
+        return result
+
+    def _download(self, response, path):
+        path = os.path.expanduser(path)
+        size = 0
+
+        with atomic_write(path) as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                size += len(chunk)
+
+        return {"saved_to": path, "bytes": size}
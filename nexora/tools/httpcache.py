@@ -0,0 +1,199 @@
+from email.utils import parsedate_to_datetime
+from requests.structures import CaseInsensitiveDict
+
+from nexora.logger import logger
+from nexora.tools.fileio import atomic_write
+
+import threading
+import hashlib
+import json
+import time
+import os
+
+CACHE_DIR = os.path.expanduser("~/.config/nexora/cache")
+
+def parse_cache_control(value) -> dict:
+    directives = {}
+
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+
+        if name:
+            directives[name.lower()] = argument.strip('"')
+
+    return directives
+
+def freshness(headers) -> float:
+    """Seconds a response stays fresh from when it was received, per Cache-Control or Expires."""
+    directives = parse_cache_control(headers.get("Cache-Control"))
+
+    if "no-cache" in directives:
+        return 0
+
+    try:
+        return max(int(directives["max-age"]), 0)
+    except (KeyError, ValueError):
+        pass
+
+    try:
+        expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+        date = parsedate_to_datetime(headers["Date"]).timestamp() if "Date" in headers else time.time()
+
+        return max(expires - date, 0)
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+class CacheEntry:
+    def __init__(self, key, meta, cache):
+        self.key = key
+        self.url = meta["url"]
+        self.status_code = meta["status_code"]
+        self.headers = CaseInsensitiveDict(meta["headers"])
+        self.stored_at = meta["stored_at"]
+        self.cache = cache
+
+    @property
+    def fresh(self):
+        return time.time() < self.stored_at + freshness(self.headers)
+
+    @property
+    def validators(self) -> dict:
+        """Headers making a conditional request for this entry."""
+        validators = {}
+
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+
+        return validators
+
+    @property
+    def body(self) -> bytes:
+        with open(self.cache.path(self.key, "body"), "rb") as f:
+            return f.read()
+
+class HTTPCache:
+    """
+    A disk cache of GET responses, following the Cache-Control, Expires, ETag and Last-Modified
+    headers. Fresh entries are served locally, stale ones with validators are revalidated
+    with a conditional request. The least recently used entries are evicted once the cache
+    holds more than `max_bytes`.
+    """
+    def __init__(self, directory=CACHE_DIR, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def key(self, url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def path(self, key, kind):
+        return os.path.join(self.directory, f"{key}.{kind}")
+
+    def get(self, url):
+        key = self.key(url)
+
+        try:
+            with open(self.path(key, "json"), "r") as f:
+                meta = json.load(f)
+
+            if meta["url"] != url or not os.path.exists(self.path(key, "body")):
+                return None
+
+            # The metadata file's mtime records the last use, for eviction
+            os.utime(self.path(key, "json"))
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return CacheEntry(key, meta, self)
+
+    @staticmethod
+    def storable(status_code, headers):
+        directives = parse_cache_control(headers.get("Cache-Control"))
+
+        if status_code != 200 or "no-store" in directives:
+            return False
+
+        # Without validators or a freshness lifetime the entry could never be reused
+        return "ETag" in headers or "Last-Modified" in headers or freshness(headers) > 0
+
+    def store(self, url, status_code, headers, body):
+        if not self.storable(status_code, headers) or len(body) > self.max_bytes:
+            return
+
+        key = self.key(url)
+        meta = {"url": url, "status_code": status_code, "headers": dict(headers), "stored_at": time.time()}
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # The body goes first, so the metadata never points at a partial body
+            self._write(self.path(key, "body"), body)
+            self._write(self.path(key, "json"), json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            logger.debug(f"Couldn't cache {url}: {e}")
+            return
+
+        self.evict()
+
+    def refresh(self, entry, headers):
+        """Applies the headers of a 304 response to `entry` and restarts its freshness lifetime."""
+        entry.headers.update(headers)
+        entry.stored_at = time.time()
+
+        meta = {"url": entry.url, "status_code": entry.status_code, "headers": dict(entry.headers), "stored_at": entry.stored_at}
+
+        try:
+            self._write(self.path(entry.key, "json"), json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            logger.debug(f"Couldn't refresh cache entry {entry.key}: {e}")
+
+    def _write(self, path, data):
+        with atomic_write(path) as f:
+            f.write(data)
+
+    def evict(self):
+        with self.lock:
+            entries = []
+            total = 0
+
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".json"):
+                    continue
+
+                key = entry.name[:-len(".json")]
+
+                try:
+                    size = entry.stat().st_size + os.stat(self.path(key, "body")).st_size
+                except OSError:
+                    continue
+
+                entries.append((entry.stat().st_mtime, key, size))
+                total += size
+
+            for _, key, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+
+                for kind in ("json", "body"):
+                    try:
+                        os.remove(self.path(key, kind))
+                    except OSError:
+                        pass
+
+                total -= size
+
+    def record(self, counter, outcome, url):
+        """Counts a lookup under `counter` (hits, revalidations or misses) and logs the totals."""
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+            logger.debug(
+                f"HTTP cache {outcome} for {url} "
+                f"(hits: {self.hits}, revalidations: {self.revalidations}, misses: {self.misses})"
+            )
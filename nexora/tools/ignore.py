@@ -0,0 +1,139 @@
+import os
+import re
+
+# Never worth walking into
+ALWAYS_IGNORED = (".git/",)
+
+def translate(pattern):
+    """Translates a .gitignore glob into a regex matched against a '/'-separated relative path."""
+    regex = ""
+    i = 0
+
+    while i < len(pattern):
+        c = pattern[i]
+
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "/.*"
+            i += 3
+            continue
+        elif c == "*":
+            regex += "[^/]*"
+        elif c == "?":
+            regex += "[^/]"
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+
+            if end == -1:
+                regex += re.escape(c)
+            else:
+                regex += "[" + pattern[i + 1:end].replace("!", "^", 1) + "]"
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(c)
+
+        i += 1
+
+    return re.compile(regex + r"\Z")
+
+class Rule:
+    def __init__(self, pattern, base):
+        self.negate = pattern.startswith("!")
+        pattern = pattern[1:] if self.negate else pattern
+
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        # Patterns with a slash are relative to the .gitignore's directory, others match any name
+        self.anchored = "/" in pattern
+        self.regex = translate(pattern.lstrip("/"))
+        self.base = base
+
+    def matches(self, path, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+
+        relative = os.path.relpath(path, self.base).replace(os.sep, "/")
+
+        if relative.startswith(".."):
+            return False
+
+        if self.anchored:
+            return bool(self.regex.match(relative))
+
+        return bool(self.regex.match(relative.rsplit("/", 1)[-1]))
+
+class IgnoreRules:
+    """
+    Decides which paths under `root` are ignored by the .gitignore files of `root` and the
+    directories below it, plus any `patterns` given. The last matching rule wins, as in git.
+    A walk should prune ignored directories, since their contents aren't checked separately.
+    """
+    def __init__(self, root, patterns=None):
+        self.root = os.path.abspath(root)
+        self.patterns = [Rule(pattern, self.root) for pattern in list(ALWAYS_IGNORED) + list(patterns or [])]
+
+        # Directory -> rules of its .gitignore, and all rules applying within it
+        self._rules = {}
+        self._chains = {}
+
+    def _load(self, directory):
+        if directory not in self._rules:
+            rules = []
+
+            try:
+                with open(os.path.join(directory, ".gitignore"), "r", errors="replace") as f:
+                    for line in f:
+                        line = line.rstrip("\n")
+
+                        if line.strip() and not line.startswith("#"):
+                            rules.append(Rule(line.rstrip(" "), directory))
+            except OSError:
+                pass
+
+            self._rules[directory] = rules
+
+        return self._rules[directory]
+
+    def _rules_for(self, directory):
+        """Rules applying to entries of `directory`: the .gitignore files from the root down to it."""
+        if directory not in self._chains:
+            if directory == self.root:
+                rules = self.patterns + self._load(directory)
+            elif directory.startswith(self.root + os.sep):
+                rules = self._rules_for(os.path.dirname(directory)) + self._load(directory)
+            else:
+                rules = self.patterns
+
+            self._chains[directory] = rules
+
+        return self._chains[directory]
+
+    def is_ignored(self, path, is_dir=False):
+        path = os.path.abspath(path)
+        ignored = False
+
+        for rule in self._rules_for(os.path.dirname(path)):
+            if rule.matches(path, is_dir):
+                ignored = not rule.negate
+
+        return ignored
+
+def walk_files(directory, patterns=None):
+    """Yields the non-hidden files under `directory` not ignored by its .gitignore files or `patterns`, sorted."""
+    rules = IgnoreRules(directory, patterns=patterns)
+
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and not rules.is_ignored(os.path.join(root, d), is_dir=True))
+
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+
+            if not file.startswith('.') and not rules.is_ignored(file_path):
+                yield file_path
@@ -1,31 +1,69 @@
 import os
-import requests
-from openai import OpenAI
+import base64
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
 
 from nexora.logger import logger
 from nexora.tools.basetool import BaseTool
+from nexora.tools.http import get_session, CHUNK_SIZE
+from nexora.tools.fileio import atomic_write
+
+# Images generated at once
+IMAGE_WORKERS = 4
 
 class ImageTool(BaseTool):
     name = "image"
 
     client = None
 
-    def generate(self, prompt: str, model_name: str = "dall-e-3", size: str = "1024x1024", quality: str = "standard") -> str:
+    def generate(self, prompt: str, model_name: str = "dall-e-3", size: str = "1024x1024", quality: str = "standard", n: int = 1, prompts: list = None, response_format: str = "url"):
         """
-        openai.function: Generate an image using OpenAI DALL-E 3 based on the given prompt. Returns the absolute path of the saved image.
-        
+        openai.function: Generate images using OpenAI DALL-E 3 based on the given prompt(s). Several images are generated concurrently. Returns the absolute path of the saved image, or a list of paths (or errors) when more than one image is generated.
+
+        prompt
+
         :param str prompt: Prompt for the image.
         :param str model_name: Model name to use for generation, default is "dall-e-3"
         :param str size: Desired image size, options are "1024x1024", "1024x1792", "1792x1024"
         :param str quality: Desired image quality, options are "standard", "hd"
+        :param int n: Number of images to generate per prompt, default is 1.
+        :param list prompts: Additional prompts to generate images for in the same call.
+        :param str response_format: "url" to download the images, or "b64_json" to receive them inline and skip the download.
         """
 
         if not self.client:
+            # Imported here so loading the tool set doesn't import the OpenAI SDK
+            from openai import OpenAI
+
             api_key = self.app.config.settings["providers"]["openai"]["api_key"]
             self.client = OpenAI(api_key=api_key)
 
+        # The tool context is per thread, so the download settings are resolved here
+        config = self.app.config
+        session = get_session(self.app, config.get("http.pool_size"))
+        timeout = (config.get("http.connect_timeout"), config.get("http.read_timeout"))
+
+        # DALL-E 3 only generates one image per request, so every image is its own request
+        jobs = [p for p in [prompt] + list(prompts or []) for _ in range(max(int(n), 1))]
+        results = [None] * len(jobs)
+
+        with ThreadPoolExecutor(max_workers=min(len(jobs), IMAGE_WORKERS)) as pool:
+            futures = {
+                pool.submit(self._generate_one, p, index if len(jobs) > 1 else None, model_name, size, quality, response_format, session, timeout): index
+                for index, p in enumerate(jobs)
+            }
+
+            # Report each image as it lands rather than after the slowest one
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+                if len(jobs) > 1:
+                    print(f"  {results[futures[future]]}")
+
+        return results[0] if len(jobs) == 1 else results
+
+    def _generate_one(self, prompt, index, model_name, size, quality, response_format, session, timeout):
         try:
             response = self.client.images.generate(
                 model=model_name,
@@ -33,9 +71,8 @@ class ImageTool(BaseTool):
                 size=size,
                 quality=quality,
                 n=1,
+                response_format=response_format,
             )
-            image_url = response.data[0].url
-            image_data = requests.get(image_url).content
 
             # Ensure the directory exists
             image_dir = os.path.expanduser("~/.config/nexora/images")
@@ -45,15 +82,23 @@ class ImageTool(BaseTool):
             prompt_slug = hashlib.md5(prompt.encode('utf-8')).hexdigest()[:6]
             truncated_prompt = prompt[:20].replace(' ', '_')
             timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            
+            suffix = f"_{index}" if index is not None else ""
+
             # Create the file name
-            image_path = os.path.join(image_dir, f"{model_name}_{timestamp}_{size}_{truncated_prompt}_{prompt_slug}.jpg")
+            image_path = os.path.join(image_dir, f"{model_name}_{timestamp}_{size}_{truncated_prompt}_{prompt_slug}{suffix}.jpg")
+
+            # Save the image, streaming downloads to disk in chunks over the pooled HTTP session
+            with atomic_write(image_path) as image_file:
+                if response_format == "b64_json":
+                    image_file.write(base64.b64decode(response.data[0].b64_json))
+                else:
+                    with session.get(response.data[0].url, stream=True, timeout=timeout) as download:
+                        download.raise_for_status()
 
-            # Save the image
-            with open(image_path, "wb") as image_file:
-                image_file.write(image_data)
+                        for chunk in download.iter_content(CHUNK_SIZE):
+                            image_file.write(chunk)
 
             return image_path
         except Exception as e:
             logger.error(f"Failed to generate image: {e}")
-            return f"Failed to generate image: {e}"
\ No newline at end of file
+            return f"Failed to generate image: {e}"
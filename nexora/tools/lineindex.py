@@ -0,0 +1,146 @@
+import os
+import threading
+
+from array import array
+from collections import OrderedDict
+from itertools import accumulate, chain, repeat
+from operator import add
+
+# Bytes read per chunk while indexing
+CHUNK_SIZE = 1 << 20
+
+# Bytes before the indexed end of a file compared to tell an append from a rewrite
+TAIL_SIZE = 4096
+
+# Number of files whose index is kept
+CACHE_SIZE = 32
+
+# Lines between the offsets kept in an index; a line is reached by scanning on from the one before it
+CHECKPOINT_INTERVAL = 1024
+
+class LineIndex:
+    """
+    The byte offset at which every CHECKPOINT_INTERVAL-th line of a file starts, so any line can
+    be reached with a seek and a scan over at most that many lines, at 8 bytes per checkpoint.
+    When the file has only grown since it was indexed (e.g. a log), only the appended bytes are
+    scanned.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self.mtime = None
+        self.tail = b""
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.checkpoints = array("Q", [0])
+        self.newlines = 0
+
+        # Where the last line starts; the end of the file if it ends with a newline
+        self.last_start = 0
+
+    def update(self):
+        stat = os.stat(self.path)
+
+        if stat.st_size == self.size and stat.st_mtime_ns == self.mtime:
+            return
+
+        if stat.st_size <= self.size or not self._is_append():
+            self._reset()
+            self.size = 0
+
+        self._scan(self.size)
+        self.mtime = stat.st_mtime_ns
+
+    def _is_append(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.size - len(self.tail))
+            return f.read(len(self.tail)) == self.tail
+
+    def _scan(self, start):
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            position = start
+
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                parts = chunk.split(b"\n")
+
+                # A line starts after every newline; sums run in C, line by line Python would be slow
+                starts = list(accumulate(chain((position,), map(add, map(len, parts[:-1]), repeat(1)))))[1:]
+
+                if starts:
+                    # starts[i] follows newline number self.newlines + i + 1
+                    first = -(self.newlines + 1) % CHECKPOINT_INTERVAL
+                    self.checkpoints.extend(starts[first::CHECKPOINT_INTERVAL])
+
+                    self.newlines += len(starts)
+                    self.last_start = starts[-1]
+
+                position += len(chunk)
+
+            self.size = position
+            f.seek(max(position - TAIL_SIZE, 0))
+            self.tail = f.read(TAIL_SIZE)
+
+    @property
+    def line_count(self):
+        if self.size == 0:
+            return 0
+
+        # The offset after a trailing newline doesn't start a line
+        return self.newlines + 1 - (self.last_start == self.size)
+
+    def offset(self, line):
+        """Byte offset of the 1-based `line`; the end of the file past the last line."""
+        if line > self.line_count:
+            return self.size
+
+        checkpoint, skip = divmod(max(line, 1) - 1, CHECKPOINT_INTERVAL)
+        position = self.checkpoints[checkpoint]
+
+        if not skip:
+            return position
+
+        with open(self.path, "rb") as f:
+            f.seek(position)
+
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                count = chunk.count(b"\n")
+
+                if count < skip:
+                    skip -= count
+                    position += len(chunk)
+                    continue
+
+                end = -1
+
+                for _ in range(skip):
+                    end = chunk.index(b"\n", end + 1)
+
+                return position + end + 1
+
+        return self.size
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_index(path) -> LineIndex:
+    """Returns the up-to-date line index of `path`, building or extending it as needed."""
+    path = os.path.abspath(path)
+
+    with _indexes_lock:
+        index = _indexes.pop(path, None) or LineIndex(path)
+        _indexes[path] = index
+
+        while len(_indexes) > CACHE_SIZE:
+            _indexes.popitem(last=False)
+
+    with index.lock:
+        index.update()
+
+    return index
+
+def invalidate(path):
+    with _indexes_lock:
+        _indexes.pop(os.path.abspath(path), None)
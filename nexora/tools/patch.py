@@ -0,0 +1,127 @@
+import difflib
+import re
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# Characters of diff returned after an edit
+MAX_DIFF_LENGTH = 5000
+
+class PatchError(ValueError):
+    pass
+
+class Hunk:
+    def __init__(self, old_start, old_count):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.old = []
+        self.new = []
+
+def parse_hunks(diff):
+    """Parses the hunks of a unified diff for a single file. Lines keep their trailing newline."""
+    hunks = []
+    hunk = None
+    previous = None
+
+    for line in diff.splitlines(keepends=True):
+        header = HUNK_HEADER.match(line)
+
+        if header:
+            old_count = int(header.group(2)) if header.group(2) is not None else 1
+            hunk = Hunk(int(header.group(1)), old_count)
+            hunks.append(hunk)
+            continue
+
+        # File headers only come before the first hunk; inside one, "--- " is a removed "-- " line
+        if hunk is None:
+            continue
+
+        text = line[1:] if line[:1] in (" ", "-", "+") else line
+
+        if not text.endswith("\n"):
+            text += "\n"
+
+        if line.startswith("\\"):
+            # "\ No newline at end of file" applies to the line before it
+            for side in previous or ():
+                side[-1] = side[-1].rstrip("\r\n")
+        elif line.startswith("-"):
+            hunk.old.append(text)
+            previous = (hunk.old,)
+        elif line.startswith("+"):
+            hunk.new.append(text)
+            previous = (hunk.new,)
+        else:
+            # Context; a bare empty line is taken as blank context, which diffs often lose
+            hunk.old.append(text)
+            hunk.new.append(text)
+            previous = (hunk.old, hunk.new)
+
+    if not hunks:
+        raise PatchError("No hunks found; the diff needs `@@ -start,count +start,count @@` headers")
+
+    return hunks
+
+def _normalize(line):
+    return line.rstrip("\r\n")
+
+def _matches(lines, position, expected):
+    if position < 0 or position + len(expected) > len(lines):
+        return False
+
+    return all(_normalize(a) == _normalize(b) for a, b in zip(lines[position:position + len(expected)], expected))
+
+def find_hunk(lines, expected, position):
+    """Finds where `expected` lines occur in `lines`, trying `position` first and then moving outwards."""
+    for distance in range(len(lines) + 1):
+        for candidate in (position - distance, position + distance) if distance else (position,):
+            if _matches(lines, candidate, expected):
+                return candidate
+
+    return None
+
+def end_lines(lines, newline="\n"):
+    """Adds a newline to every line but the last that lacks one, e.g. an old last line now followed by others."""
+    return [line if line.endswith("\n") else line + newline for line in lines[:-1]] + lines[-1:]
+
+def apply_hunks(lines, hunks, newline="\n"):
+    """
+    Applies `hunks` to `lines`, checking each hunk's context and removed lines against the
+    file. Hunks whose line numbers are off still apply where their context matches, nearest
+    first. Raises PatchError, leaving `lines` untouched, if a hunk doesn't match anywhere.
+    """
+    result = list(lines)
+    offset = 0
+
+    for hunk in hunks:
+        # A hunk removing nothing inserts after its start line
+        expected_position = hunk.old_start - 1 + offset if hunk.old_count else hunk.old_start + offset
+
+        if not hunk.old:
+            position = min(max(expected_position, 0), len(result))
+        else:
+            position = find_hunk(result, hunk.old, max(expected_position, 0))
+
+        if position is None:
+            actual = "".join(result[max(expected_position, 0):max(expected_position, 0) + len(hunk.old)])
+            raise PatchError(
+                f"Hunk at line {hunk.old_start} doesn't match the file. Expected:\n{''.join(hunk.old)}\n"
+                f"Found at line {hunk.old_start}:\n{actual}"
+            )
+
+        new = [line[:-1] + newline if line.endswith("\n") else line for line in hunk.new]
+
+        result[position:position + len(hunk.old)] = new
+        offset += position - expected_position + len(new) - len(hunk.old)
+
+    return end_lines(result, newline)
+
+def compact_diff(path, before, after):
+    """A unified diff of an edit with one line of context, cut down if long."""
+    # A last line without a newline would otherwise run into the next line of the diff
+    before, after = ([line if line.endswith("\n") else line + "\n" for line in lines] for lines in (before, after))
+    diff = "".join(difflib.unified_diff(before, after, fromfile=path, tofile=path, n=1))
+
+    if len(diff) > MAX_DIFF_LENGTH:
+        diff = diff[:MAX_DIFF_LENGTH] + f"\n[... diff cut off, {len(diff) - MAX_DIFF_LENGTH} more characters]"
+
+    return diff
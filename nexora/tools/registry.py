@@ -0,0 +1,108 @@
+from docstring_parser import parse
+
+FUNCTION_PREFIX = "openai.function: "
+
+TYPE_MAP = {
+    "int": "number",
+    "str": "string",
+    "bool": "boolean",
+    "list": "array",
+}
+
+class ToolRegistry:
+    """
+    Compiles the JSON schemas of a tool class once, from its method docstrings, and caches
+    them keyed by class, along with pre-rendered variants for each provider's tool format.
+    """
+    _compiled = {}
+    _rendered = {}
+
+    @classmethod
+    def compile(cls, tool_class):
+        if tool_class in cls._compiled:
+            return cls._compiled[tool_class]
+
+        func = []
+
+        for attr in dir(tool_class):
+            if attr.startswith("__"):
+                continue
+
+            method = getattr(tool_class, attr)
+
+            if not callable(method) or not method.__doc__:
+                continue
+
+            docstring = parse(method.__doc__)
+
+            if not docstring.short_description or not docstring.short_description.startswith(FUNCTION_PREFIX):
+                continue
+
+            properties = {}
+
+            for param in docstring.params:
+                type_name = TYPE_MAP.get(param.type_name, "string")
+
+                properties[param.arg_name] = {
+                    "type": type_name,
+                    "description": param.description
+                }
+
+                if type_name == "array":
+                    properties[param.arg_name]["items"] = {
+                        "type": "string"
+                    }
+
+            try:
+                required = docstring.long_description.split(",")
+            except AttributeError:
+                required = []
+
+            function = {
+                "name": f"{tool_class.name}_{attr}",
+                "description": docstring.short_description[len(FUNCTION_PREFIX):],
+                "parameters": {
+                    "type": "object",
+                    "properties": properties,
+                    "required": required
+                }
+            }
+
+            func.append({
+                "type": "function",
+                "function": function
+            })
+
+        cls._compiled[tool_class] = func
+
+        return func
+
+    @classmethod
+    def render(cls, tool_class, format="openai"):
+        key = (tool_class, format)
+
+        if key not in cls._rendered:
+            schemas = cls.compile(tool_class)
+
+            if format == "openai":
+                rendered = schemas
+            elif format == "anthropic":
+                rendered = [
+                    {
+                        "name": schema["function"]["name"],
+                        "description": schema["function"]["description"],
+                        "input_schema": schema["function"]["parameters"]
+                    }
+                    for schema in schemas
+                ]
+            else:
+                raise ValueError(f"Unknown tool schema format '{format}'")
+
+            cls._rendered[key] = rendered
+
+        return cls._rendered[key]
+
+    @classmethod
+    def clear(cls):
+        cls._compiled.clear()
+        cls._rendered.clear()
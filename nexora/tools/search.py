@@ -0,0 +1,163 @@
+from .basetool import BaseTool, readonly
+from .ignore import walk_files
+from .searchindex import TrigramIndex, required_literal, SNIFF_BYTES
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from fnmatch import fnmatch
+
+import os
+import re
+
+# Threads searching files
+SEARCH_WORKERS = 8
+
+# Matched lines are cut to this many characters
+MAX_LINE_LENGTH = 500
+
+class Search(BaseTool):
+    name = "search"
+
+    @readonly
+    def grep(self, pattern, directory=".", literal=False, ignore_case=False, context=0, max_results=100, glob=None, use_index=True):
+        """
+        openai.function: Search the contents of files under a directory for a regex or literal string, like grep. Hidden and .gitignore'd files are skipped. Prefer this over reading files or running grep in the shell. Output is `path:line: text` per match, with context lines as `path-line- text`.
+
+        pattern
+
+        :param str pattern: The regular expression (Python syntax) or, with `literal`, the exact text to search for.
+        :param str directory: The directory to search in, default is the current directory.
+        :param bool literal: Treat `pattern` as exact text instead of a regular expression.
+        :param bool ignore_case: Match case-insensitively.
+        :param int context: Number of lines of context to show around each match, default is 0.
+        :param int max_results: Maximum number of matching lines to return, default is 100.
+        :param str glob: Only search files whose name matches this glob, e.g. "*.py".
+        :param bool use_index: Narrow down files with the persisted trigram index of the directory, default is true.
+        """
+        context, max_results = int(context), int(max_results)
+
+        regex = re.compile(re.escape(pattern) if literal else pattern, re.IGNORECASE if ignore_case else 0)
+
+        paths = [path for path in walk_files(directory) if not glob or fnmatch(os.path.basename(path), glob)]
+        searched = len(paths)
+
+        required = pattern if literal else required_literal(pattern)
+
+        # Trigrams are only lowercased for ASCII, so other case-insensitive patterns can't use them
+        if ignore_case and required and not required.isascii():
+            required = None
+
+        if use_index and required and len(required) >= 3:
+            index = TrigramIndex(directory)
+            index.update(paths)
+            index.save()
+
+            paths = list(index.candidates(paths, required))
+
+        output = []
+        matches = 0
+
+        with closing(self._search_files(paths, regex, context, max_results)) as results:
+            for result in results:
+                for line_matches, lines in result:
+                    if matches >= max_results:
+                        break
+
+                    matches += line_matches
+                    output.append(lines)
+
+                if matches >= max_results:
+                    break
+
+        if not output:
+            return f"No matches in {searched} files."
+
+        if matches >= max_results:
+            output.append(f"[Stopped after {max_results} matches; narrow the search or raise max_results]")
+
+        return "\n".join(output)
+
+    def _search_files(self, paths, regex, context, max_results):
+        """Searches files on a thread pool, yielding results in the order of `paths` as they complete."""
+        window = deque()
+
+        with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as pool:
+            try:
+                for path in paths:
+                    window.append(pool.submit(self._search_file, path, regex, context, max_results))
+
+                    # Bound the searches in flight, so stopping at max_results stops the work too
+                    if len(window) >= SEARCH_WORKERS * 4:
+                        yield window.popleft().result()
+
+                while window:
+                    yield window.popleft().result()
+            finally:
+                for future in window:
+                    future.cancel()
+
+    def _search_file(self, path, regex, context, max_results):
+        """
+        Returns (number of matches, formatted lines) per group of nearby matches in a file, up to
+        max_results matches. The file is read line by line, keeping only the lines around a match.
+        """
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return []
+
+        results = []
+
+        # [matches, formatted lines, number of the group's last line]
+        group = None
+        before = deque(maxlen=context)
+        after = 0
+        matches = 0
+
+        with f:
+            try:
+                if b"\0" in f.read(SNIFF_BYTES):
+                    return []
+
+                f.seek(0)
+
+                for number, data in enumerate(f):
+                    if matches >= max_results and not after:
+                        break
+
+                    line = data.decode("utf-8", errors="replace").rstrip("\r\n")[:MAX_LINE_LENGTH]
+
+                    if matches < max_results and regex.search(line):
+                        # A group ends when lines between it and this match fell outside the context
+                        if group and number - len(before) > group[2] + 1:
+                            results.append(self._format_group(group, context))
+                            group = None
+
+                        group = group or [0, [], number]
+                        group[1] += [self._format_line(path, n, text, "-") for n, text in before]
+                        group[1].append(self._format_line(path, number, line, ":"))
+                        group[0] += 1
+                        group[2] = number
+                        before.clear()
+                        after = context
+                        matches += 1
+                    elif after:
+                        group[1].append(self._format_line(path, number, line, "-"))
+                        group[2] = number
+                        after -= 1
+                    elif context:
+                        before.append((number, line))
+            except OSError:
+                pass
+
+        if group:
+            results.append(self._format_group(group, context))
+
+        return results
+
+    def _format_line(self, path, number, line, separator):
+        return f"{path}{separator}{number + 1}{separator} {line}"
+
+    def _format_group(self, group, context):
+        return group[0], "\n".join(group[1] + (["--"] if context else []))
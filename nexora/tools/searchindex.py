@@ -0,0 +1,207 @@
+import hashlib
+import os
+import pickle
+import threading
+
+from nexora.logger import logger
+from nexora.tools.fileio import atomic_write
+
+INDEX_DIR = os.path.expanduser("~/.config/nexora/index")
+
+# Files above this size are searched directly and never indexed
+MAX_INDEXED_SIZE = 2 * 1024 * 1024
+
+# Leading bytes checked for NUL bytes to tell binary files apart
+SNIFF_BYTES = 8192
+
+# Saves of an index are serialized, as searches run in parallel
+_save_lock = threading.Lock()
+
+# Escapes followed by a fixed number of hex digits, e.g. \x41
+HEX_ESCAPES = {"x": 2, "u": 4, "U": 8}
+
+# Regex characters that end a run of literal text
+SPECIAL = set(".^$*+?{}[]\\|()")
+
+def trigrams(data: bytes) -> set:
+    """Lowercased byte trigrams of `data`, so one index serves case-sensitive and -insensitive searches."""
+    data = data.lower()
+
+    return set(map(bytes, zip(data, data[1:], data[2:])))
+
+def pack(grams) -> bytes:
+    """Packs trigrams into one sorted bytes object of 3-byte records; about 3 bytes per trigram."""
+    return b"".join(sorted(grams))
+
+def contains(packed: bytes, gram: bytes) -> bool:
+    # Binary search over the fixed-width records
+    low, high = 0, len(packed) // 3
+
+    while low < high:
+        middle = (low + high) // 2
+        record = packed[middle * 3:middle * 3 + 3]
+
+        if record == gram:
+            return True
+        elif record < gram:
+            low = middle + 1
+        else:
+            high = middle
+
+    return False
+
+def required_literal(pattern: str):
+    """
+    Returns the longest run of literal text that every match of the regex `pattern` must contain,
+    or None if there isn't one of at least 3 characters. Patterns with alternatives, groups or
+    lookarounds get None, as text inside them may be optional, repeated or never matched.
+    """
+    if "|" in pattern:
+        return None
+
+    runs = []
+    run = ""
+    i = 0
+
+    while i < len(pattern):
+        c = pattern[i]
+
+        if c == "\\" and i + 1 < len(pattern):
+            start = i
+            escaped = pattern[i + 1]
+            i += 2
+
+            # \w, \d, \b etc. are classes or anchors; anything else is an escaped literal
+            if escaped.isalnum():
+                runs.append(run)
+                run = ""
+
+                # Skip the arguments of character codes (\x41, \u00e9, \N{...}), octal escapes and
+                # backreferences, so they aren't taken for literal text
+                if escaped in HEX_ESCAPES:
+                    i += HEX_ESCAPES[escaped]
+                elif escaped == "N":
+                    end = pattern.find("}", i)
+                    i = end + 1 if end != -1 else len(pattern)
+                elif escaped.isdigit():
+                    while i < len(pattern) and pattern[i].isdigit() and i - start < 4:
+                        i += 1
+            else:
+                run += escaped
+
+            continue
+
+        if c in "*?{":
+            # The preceding character is optional or repeated
+            run = run[:-1]
+            runs.append(run)
+            run = ""
+
+            if c == "{":
+                end = pattern.find("}", i)
+                i = end if end != -1 else len(pattern)
+        elif c == "[":
+            runs.append(run)
+            run = ""
+            end = pattern.find("]", i + 2)
+            i = end if end != -1 else len(pattern)
+        elif c == "(":
+            return None
+        elif c in SPECIAL:
+            runs.append(run)
+            run = ""
+        else:
+            run += c
+
+        i += 1
+
+    runs.append(run)
+    longest = max(runs, key=len)
+
+    return longest if len(longest) >= 3 else None
+
+class TrigramIndex:
+    """
+    A persisted trigram index of the files under a directory, used to narrow down which files
+    a search has to read. Files are re-indexed only when their mtime or size changes.
+    """
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(INDEX_DIR, hashlib.sha1(self.root.encode("utf-8")).hexdigest() + ".pickle")
+
+        # Absolute path -> (mtime, size, packed trigrams); trigrams are None for files too large to
+        # index and False for binary files, which searches skip
+        self.files = {}
+        self.changed = False
+
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+
+            if data.get("root") == self.root:
+                self.files = data["files"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError) as e:
+            logger.debug(f"Starting a new search index for {self.root}: {e}")
+
+    def save(self):
+        if not self.changed:
+            return
+
+        os.makedirs(INDEX_DIR, exist_ok=True)
+
+        with _save_lock, atomic_write(self.path) as f:
+            pickle.dump({"root": self.root, "files": self.files}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.changed = False
+
+    def update(self, paths):
+        """Brings the index in line with `paths`, the files currently in the tree."""
+        current = set()
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            # Keyed by absolute path, so searches given the same tree differently share entries
+            key = os.path.abspath(path)
+            current.add(key)
+            entry = self.files.get(key)
+
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                continue
+
+            grams = None
+
+            if stat.st_size <= MAX_INDEXED_SIZE:
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+
+                grams = False if b"\0" in data[:SNIFF_BYTES] else pack(trigrams(data))
+
+            self.files[key] = (stat.st_mtime_ns, stat.st_size, grams)
+            self.changed = True
+
+        for path in set(self.files) - current:
+            del self.files[path]
+            self.changed = True
+
+    def candidates(self, paths, literal):
+        """Filters `paths` down to the files that may contain `literal`."""
+        query = trigrams(literal.encode("utf-8"))
+
+        for path in paths:
+            entry = self.files.get(os.path.abspath(path))
+
+            # Unindexed files have to be searched
+            if not entry or entry[2] is None:
+                yield path
+            elif entry[2] and all(contains(entry[2], gram) for gram in query):
+                yield path
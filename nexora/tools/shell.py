@@ -1,13 +1,163 @@
 from .basetool import BaseTool
+from uuid import uuid4
+
 import subprocess
+import threading
+import signal
 import shlex
+import queue
 import time
+import sys
+import os
+
+# Bytes of each stream kept from the start and from the end of a command's output;
+# anything in between is shown live but dropped from the tool result
+HEAD_BYTES = 8000
+TAIL_BYTES = 8000
+
+# Bytes read from a pipe at a time
+CHUNK_SIZE = 65536
+
+# Seconds a timed out command gets to exit after SIGTERM before it's killed
+KILL_GRACE = 2
+
+class OutputBuffer:
+    """Keeps the first `head_size` and the last `tail_size` bytes written to it, counting the rest."""
+    def __init__(self, head_size=HEAD_BYTES, tail_size=TAIL_BYTES):
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data):
+        self.total += len(data)
+
+        room = self.head_size - len(self.head)
+
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+
+        if data:
+            self.tail += data
+
+            # The tail never grows past tail_size + CHUNK_SIZE, so trimming it stays cheap
+            if len(self.tail) > self.tail_size:
+                del self.tail[:len(self.tail) - self.tail_size]
+
+    @property
+    def dropped(self):
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self):
+        head = self.head.decode(errors="replace")
+        tail = self.tail.decode(errors="replace")
+
+        if self.dropped:
+            return f"{head}\n[... {self.dropped} bytes dropped ...]\n{tail}"
+
+        return head + tail
+
+class ShellSession:
+    """
+    A long-lived bash process that commands are written to one at a time, so the working
+    directory, environment and shell variables carry over between them. Every command is
+    followed by a unique marker carrying its exit status, which is how the end of its output
+    is found.
+    """
+    def __init__(self):
+        self.marker = f"__nexora_{uuid4().hex}__"
+        self.process = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+
+        # Output chunks, None once the shell has exited
+        self.chunks = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        with self.process.stdout as pipe:
+            for chunk in iter(lambda: os.read(pipe.fileno(), CHUNK_SIZE), b""):
+                self.chunks.put(chunk)
+
+        self.chunks.put(None)
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, command, output, timeout=None, on_output=None):
+        """
+        Runs `command`, writing its output to `output` and `on_output`. Returns the exit code,
+        or None if the shell exited. Raises subprocess.TimeoutExpired if it doesn't finish in time.
+        """
+        # stdin is the session's own pipe, so commands mustn't read from it
+        script = f"{{ {command}\n}} < /dev/null\nprintf '\\n{self.marker} %s\\n' \"$?\"\n"
+        self.process.stdin.write(script.encode())
+        self.process.stdin.flush()
+
+        end = f"\n{self.marker} ".encode()
+        deadline = time.monotonic() + timeout if timeout else None
+        window = bytearray()
+
+        def emit(data):
+            if data:
+                output.write(bytes(data))
+
+                if on_output:
+                    on_output(bytes(data))
+
+        while True:
+            try:
+                chunk = self.chunks.get(timeout=max(deadline - time.monotonic(), 0) if deadline else None)
+            except queue.Empty:
+                emit(window)
+                raise subprocess.TimeoutExpired(command, timeout)
+
+            if chunk is None:
+                emit(window)
+                return None
+
+            window += chunk
+            index = window.find(end)
+
+            if index != -1:
+                newline = window.find(b"\n", index + len(end))
+
+                if newline != -1:
+                    emit(window[:index])
+                    return int(window[index + len(end):newline])
+            elif len(window) >= len(end):
+                # Hold back just enough to catch a marker split across chunks
+                emit(window[:1 - len(end)])
+                del window[:1 - len(end)]
+
+    def close(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+        self.process.wait()
 
 class Shell(BaseTool):
     name = "shell"
 
+    # Whether command output is echoed to the terminal while the command runs
+    live_output = True
+
+    def __init__(self):
+        super().__init__()
+        self._output_lock = threading.Lock()
+        self._session = None
+
     def run(self, command, timeout=60):
-        """openai.function: Executes a command in the shell. Try not to run commands that will hang or block indefinitely. If a command does hang, timeout will protect from an indefinite hang and kill it after the specified timeout.
+        """openai.function: Executes a command in the shell. Try not to run commands that will hang or block indefinitely. If a command does hang, timeout will protect from an indefinite hang and kill it after the specified timeout. Long outputs are cut down to their start and end.
 
         command,timeout
 
@@ -19,28 +169,140 @@ class Shell(BaseTool):
 
         self.safe(f"Run `{command}`")
 
+        timeout = int(timeout)
+
+        if timeout == -1:
+            timeout = None
+
         try:
             # Use shlex to properly handle splitting the command
             args = shlex.split(command)
 
-            # Start the process
-            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            # A new session makes the command the leader of its own process group, so a
+            # timeout can kill everything it started, not just the direct child
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True)
+        except Exception as e:
+            return {"error": str(e)}
 
-            # Use communicate to handle input/output and enforce the timeout
-            if timeout == -1:
-                timeout = None
+        stdout, stderr = OutputBuffer(), OutputBuffer()
+        readers = [
+            threading.Thread(target=self._pump, args=(process.stdout, stdout, sys.stdout), daemon=True),
+            threading.Thread(target=self._pump, args=(process.stderr, stderr, sys.stderr), daemon=True),
+        ]
 
-            stdout, stderr = process.communicate(timeout=timeout)
+        for reader in readers:
+            reader.start()
 
-            result = {
-                "stdout": stdout.decode(),
-                "stderr": stderr.decode(),
-                "exit_code": process.returncode
-            }
+        timed_out = False
 
-            # Return process output and error message, if any
-            return result
+        try:
+            process.wait(timeout=timeout)
         except subprocess.TimeoutExpired:
-            return {"error": "Command timed out after {} seconds".format(timeout)}
-        except Exception as e:
-            return {"error": str(e)}
+            timed_out = True
+            self._kill(process)
+        except BaseException:
+            # e.g. Ctrl+C, the command shouldn't outlive the call
+            self._kill(process)
+            raise
+
+        for reader in readers:
+            # Background processes that escaped the group can hold the pipes open
+            reader.join(timeout=KILL_GRACE)
+
+        result = {
+            "stdout": stdout.text(),
+            "stderr": stderr.text(),
+            "exit_code": process.returncode
+        }
+
+        dropped = stdout.dropped + stderr.dropped
+
+        if dropped:
+            result["dropped_bytes"] = dropped
+
+        if timed_out:
+            result["error"] = f"Command timed out after {timeout} seconds and was killed"
+
+        return result
+
+    def session(self, command, timeout=60):
+        """openai.function: Executes a command in a persistent bash session. Unlike shell_run, the working directory, environment variables, activated virtualenvs and shell variables carry over between calls, and full bash syntax (`&&`, pipes, redirects) is allowed, so run related commands here in one call. Commands can't read from stdin. On timeout the session is killed and a fresh one starts, losing that state. Long outputs are cut down to their start and end.
+
+        command,timeout
+
+        :param str command: The bash command(s) to execute.
+        :param int timeout: Time in seconds to wait for the command to finish, default is 60. Set to -1 to wait until completion.
+        """
+        self.safe(f"Run `{command}` in the shell session")
+
+        timeout = int(timeout)
+
+        if timeout == -1:
+            timeout = None
+
+        if not self._session or not self._session.alive:
+            self._session = ShellSession()
+
+        output = OutputBuffer()
+        on_output = (lambda chunk: self._echo(sys.stdout, chunk)) if self.live_output else None
+
+        try:
+            exit_code = self._session.run(command, output, timeout=timeout, on_output=on_output)
+        except subprocess.TimeoutExpired:
+            self.reset()
+
+            return {
+                "output": output.text(),
+                "error": f"Command timed out after {timeout} seconds; the session was killed and its state is lost"
+            }
+
+        result = {"output": output.text(), "exit_code": exit_code}
+
+        if output.dropped:
+            result["dropped_bytes"] = output.dropped
+
+        if exit_code is None:
+            self._session = None
+            result["error"] = "The shell exited; the next command starts a new session"
+
+        return result
+
+    def reset(self):
+        """openai.function: Kills the persistent bash session used by shell_session; the next command starts a fresh one in the original working directory and environment."""
+        if self._session:
+            self._session.close()
+            self._session = None
+
+        return {"success": True}
+
+    def _pump(self, pipe, buffer, terminal):
+        """Copies a pipe into `buffer` as it's written, echoing it to `terminal`."""
+        with pipe:
+            for chunk in iter(lambda: os.read(pipe.fileno(), CHUNK_SIZE), b""):
+                buffer.write(chunk)
+
+                if self.live_output:
+                    self._echo(terminal, chunk)
+
+    def _echo(self, terminal, chunk):
+        with self._output_lock:
+            try:
+                terminal.buffer.write(chunk)
+                terminal.flush()
+            except (AttributeError, ValueError, OSError):
+                # Not a real terminal (or already closed); the output is still captured
+                pass
+
+    def _kill(self, process):
+        """Terminates the command's whole process group, escalating to SIGKILL."""
+        for sig, wait in ((signal.SIGTERM, KILL_GRACE), (signal.SIGKILL, None)):
+            try:
+                os.killpg(process.pid, sig)
+            except (ProcessLookupError, PermissionError):
+                break
+
+            try:
+                process.wait(timeout=wait)
+                break
+            except subprocess.TimeoutExpired:
+                continue
@@ -5,5 +5,13 @@ class Function:
         self.name = name
         self.arguments = json.dumps(arguments)
 
+    @classmethod
+    def from_json(cls, name, arguments: str):
+        """Builds a Function from arguments that are already JSON-encoded."""
+        function = cls(name, None)
+        function.arguments = arguments
+
+        return function
+
     def __repr__(self):
         return "Function(name='{}', parameters={})".format(self.name, repr(self.arguments))
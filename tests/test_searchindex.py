@@ -0,0 +1,24 @@
+from nexora.tools.searchindex import required_literal
+from nexora.tools.search import Search
+
+def test_required_literal_skips_escape_arguments():
+    assert required_literal(r"\x41BCD") == "BCD"
+    assert required_literal(r"\101BCD") == "BCD"
+    assert required_literal(r"\u00e9BCD") == "BCD"
+    assert required_literal(r"\N{LATIN SMALL LETTER E}BCD") == "BCD"
+
+def test_required_literal_ignores_groups():
+    assert required_literal("(foobar)?baz") is None
+    assert required_literal("(?!foobar)baz") is None
+    assert required_literal("x(abc)*y") is None
+
+def test_index_finds_escaped_characters(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr("nexora.tools.searchindex.INDEX_DIR", str(tmp_path / "index"))
+    (tmp_path / "a.txt").write_text("ABCD\n")
+
+    search = Search.__new__(Search)
+
+    for pattern in (r"\x41BCD", r"\101BCD"):
+        assert search.grep(pattern, str(tmp_path), use_index=True) == search.grep(pattern, str(tmp_path), use_index=False)
+        assert "a.txt:1: ABCD" in search.grep(pattern, str(tmp_path))